@@ -1,27 +1,51 @@
+import hashlib
+import io
+import sys
+from pathlib import Path
+
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 from datetime import datetime
 
+# Permite importar o pacote compartilhado `dash_utils` (na raiz do repositório)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dash_utils.bitmap import IndiceBitmap
+from dash_utils.figuras import CacheFiguras
+from dash_utils.memoria import resumo_memoria, somente_leitura, tamanho_memoria
+from dash_utils.resultados import CacheResultados, chave_resultado, versao_codigo
+from dash_utils.vendas import versao_arquivo
+
 
 # --- 1. CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(layout="wide")
 
 
 # 2--------- CONFIGURAÇÕES INICIAIS ---
-@st.cache_data
-def carregar_dados():
+@st.cache_resource(max_entries=1)
+def carregar_dados(versao):
     """
     Carrega e transforma os dados da planilha Excel.
     Mostra um erro e para o app se o arquivo não for encontrado.
+    O DataFrame é único para todas as sessões (sem uma cópia por sessão) e
+    os filtros sempre geram novos DataFrames. As colunas de números e datas
+    são marcadas como somente leitura (uma alteração no lugar lança erro); as
+    de texto não (veja `somente_leitura`).
+    A `versao` da planilha (`versao_arquivo`) entra na chave deste cache e dos
+    que dependem dele, que são recriados juntos quando o arquivo muda.
+    Devolve também o hash do conteúdo lido, que identifica os agregados no
+    cache em disco.
     """
     try:
-        df = pd.read_excel("AGENDAMENTOS.xlsx")
+        with open("AGENDAMENTOS.xlsx", "rb") as arquivo:
+            conteudo = arquivo.read()
     except FileNotFoundError:
         st.error(
             "Arquivo 'AGENDAMENTOS.xlsx' não encontrado! Verifique se ele está na mesma pasta do script."
         )
         st.stop()  # Interrompe a execução do script de forma limpa
+    df = pd.read_excel(io.BytesIO(conteudo))
 
     # Aplica as transformações de forma encadeada para maior clareza
     df["Data"] = pd.to_datetime(df["Data"], errors="coerce")
@@ -33,11 +57,191 @@ def carregar_dados():
     df["Ano"] = df["Data"].dt.year
     df["Mês"] = df["Data"].dt.to_period("M").astype(str)
 
-    return df
+    hash_conteudo = hashlib.blake2b(conteudo, digest_size=16).hexdigest()
+    return somente_leitura(df), hash_conteudo
+
+
+@st.cache_resource(max_entries=1)
+def memoria_base(versao):
+    """Memória da base compartilhada, medida uma vez (a base não muda)."""
+    return tamanho_memoria(carregar_dados(versao)[0], profundo=True)
+
+
+@st.cache_resource(max_entries=1)
+def criar_indice_filtros(versao):
+    """
+    Cria o índice de bitmaps das colunas dos filtros de seleção múltipla,
+    compartilhado entre as sessões.
+    """
+    return IndiceBitmap(
+        carregar_dados(versao)[0],
+        ["Ano", "Profissional", "Serviço", "Status_descrito"],
+    )
+
+
+@st.cache_resource
+def abrir_cache_resultados():
+    """
+    Cache em disco dos agregados (ao lado da planilha): sobrevive a reinícios
+    do servidor e é compartilhado por todos os processos do app.
+    """
+    return CacheResultados("AGENDAMENTOS.xlsx.resultados.sqlite")
+
+
+def calcular_agregados(df_filtrado):
+    """
+    Calcula os KPIs e os agregados dos gráficos e do ranking de clientes a
+    partir dos agendamentos filtrados.
+    """
+    df_realizado = df_filtrado[df_filtrado["Status_descrito"] == "Realizado"]
+    df_cancelados = df_filtrado[df_filtrado["Status_descrito"] == "Cancelado"]
+    cancel_por_prof = df_cancelados["Profissional"].value_counts().reset_index()
+    cancel_por_prof.columns = ["Profissional", "Cancelamentos"]
+
+    try:
+        dias = df_filtrado["Data"].dt.day_name(locale="pt_BR.utf8")
+    except Exception:
+        dias = df_filtrado["Data"].dt.day_name()
+
+    horarios_validos = [
+        "09:00:00",
+        "09:40:00",
+        "10:20:00",
+        "11:00:00",
+        "13:00:00",
+        "13:40:00",
+        "14:20:00",
+        "15:00:00",
+        "15:40:00",
+        "16:20:00",
+        "17:00:00",
+        "17:40:00",
+        "18:20:00",
+        "19:00:00",
+    ]
+    horarios = df_filtrado["Horário"].astype(str)
+
+    df_clientes_reais = df_realizado[df_realizado["Cliente"] != "Sem Cadastro"]
+    top_clientes = (
+        df_clientes_reais["Cliente"].value_counts().nlargest(10).reset_index()
+    )
+    top_clientes.columns = ["Cliente", "Nº de Visitas"]
+
+    return {
+        "total_faturamento": df_realizado["Valor"].sum(),
+        "total_agendamentos_realizados": df_realizado.shape[0],
+        "faturamento_por_servico": (
+            df_realizado.groupby("Serviço")["Valor"].sum().sort_values(ascending=True)
+        ),
+        "status_counts": df_filtrado["Status_descrito"].value_counts(),
+        "cancel_por_prof": cancel_por_prof,
+        "agend_por_dia": dias.rename("Dia da Semana").value_counts(),
+        "agend_por_hora": (
+            horarios[horarios.isin(horarios_validos)].value_counts().sort_index()
+        ),
+        "top_clientes": top_clientes,
+    }
+
+
+@st.cache_resource
+def abrir_cache_figuras():
+    """
+    Figuras Plotly prontas, compartilhadas pelas sessões: um filtro que não
+    muda o dado de um gráfico não monta a figura de novo.
+    """
+    return CacheFiguras(max_figuras=64)
 
 
-# Uso da função
-df_original = carregar_dados()
+def figura_faturamento_profissional(df_realizado):
+    """Barras agrupadas do faturamento por profissional e serviço."""
+    fig = px.bar(
+        df_realizado,
+        x="Profissional",
+        y="Valor",
+        color="Serviço",
+        title="Faturamento por Profissional e Serviço",
+        labels={"Valor": "Faturamento (R$)", "Profissional": "Profissional"},
+        barmode="group",
+    )
+    fig.update_traces(
+        hovertemplate=(
+            "<b>Profissional:</b> %{x}<br>"
+            "<b>Serviço:</b> %{data.name}<br>"
+            "<b>Faturamento:</b> R$ %{y:,.2f}<extra></extra>"
+        )
+    )
+    return fig
+
+
+def figura_faturamento_servico(faturamento_por_servico):
+    """Barras horizontais do faturamento por serviço."""
+    fig = px.bar(
+        faturamento_por_servico,
+        x=faturamento_por_servico.values,
+        y=faturamento_por_servico.index,
+        orientation="h",
+        title="Faturamento por Serviço no Período",
+        text_auto=True,
+        labels={"x": "Faturamento Total (R$)", "y": "Serviço"},
+    )
+    fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    return fig
+
+
+def figura_status(status_counts):
+    """Rosca com a distribuição dos status dos agendamentos."""
+    return px.pie(
+        values=status_counts.values,
+        names=status_counts.index,
+        title="Distribuição Geral de Status dos Agendamentos",
+        hole=0.3,
+    )
+
+
+def figura_cancelamentos(cancel_por_prof):
+    """Barras com os cancelamentos por profissional."""
+    return px.bar(
+        cancel_por_prof,
+        x="Profissional",
+        y="Cancelamentos",
+        title="Total de Cancelamentos por Profissional",
+        text_auto=True,
+    )
+
+
+def figura_fluxo_dia(agend_por_dia):
+    """Barras com os agendamentos por dia da semana."""
+    fig = px.bar(
+        agend_por_dia,
+        title="Agendamentos por Dia da Semana",
+        labels={
+            "value": "Quantidade de Agendamentos",
+            "index": "Dia da Semana",
+        },
+        text_auto=True,
+    )
+    fig.update_layout(xaxis={"categoryorder": "total descending"})
+    return fig
+
+
+def figura_fluxo_hora(agend_por_hora):
+    """Barras com os agendamentos por horário."""
+    return px.bar(
+        agend_por_hora,
+        title="Agendamentos por Horário (Horas Selecionadas)",
+        labels={"value": "Quantidade de Agendamentos", "index": "Horário"},
+        text_auto=True,
+    )
+
+
+# Uso da função (a versão da planilha é lida a cada interação)
+try:
+    versao_planilha = versao_arquivo("AGENDAMENTOS.xlsx")
+except FileNotFoundError:
+    versao_planilha = None  # `carregar_dados` mostra o erro
+df_original, hash_planilha = carregar_dados(versao_planilha)
+indice_filtros = criar_indice_filtros(versao_planilha)
+figuras = abrir_cache_figuras()
 
 
 # --- 3. BARRA LATERAL (FILTROS) ---
@@ -82,16 +286,22 @@ data_selecionada = st.sidebar.date_input(
 if not isinstance(data_selecionada, (tuple, list)) or len(data_selecionada) != 2:
     data_selecionada = (min_data, max_data)
 
-# filtro de serviço
+# filtro de serviço (seleções resolvidas pelo índice de bitmaps)
+selecao = {
+    "Ano": anos_selecionados,
+    "Profissional": profissionais_selecionados,
+    "Serviço": servicos_selecionados,
+    "Status_descrito": status_selecionados,
+}
 df_filtrado = df_original[
-    (df_original["Ano"].isin(anos_selecionados))
-    & (df_original["Profissional"].isin(profissionais_selecionados))
-    & (df_original["Serviço"].isin(servicos_selecionados))
-    & (df_original["Status_descrito"].isin(status_selecionados))
+    indice_filtros.mascara(selecao)
     & (df_original["Data"] >= pd.to_datetime(data_selecionada[0]))
     & (df_original["Data"] <= pd.to_datetime(data_selecionada[1]))
 ]
 
+# Memória da base (compartilhada pelas sessões) e do filtro desta sessão
+st.sidebar.caption(resumo_memoria(memoria_base(versao_planilha), df_filtrado))
+
 
 # --- 4. TÍTULO PRINCIPAL DO DASHBOARD ---
 st.title("📊 Análise de Situação da Barbearia")
@@ -100,8 +310,22 @@ st.markdown("---")
 # --- 5. MÉTRICAS PRINCIPAIS (KPIs) ---
 df_realizado = df_filtrado[df_filtrado["Status_descrito"] == "Realizado"]
 
-total_faturamento = df_realizado["Valor"].sum()
-total_agendamentos_realizados = df_realizado.shape[0]
+# Agregados do filtro atual, do cache em disco quando a mesma combinação de
+# planilha, código e filtros já foi calculada (por esta ou por outra
+# sessão/processo)
+agregados = abrir_cache_resultados().obter(
+    chave_resultado(
+        hash_planilha,
+        versao_codigo(calcular_agregados),
+        "agregados",
+        selecao,
+        tuple(data_selecionada),
+    ),
+    lambda: calcular_agregados(df_filtrado),
+)
+
+total_faturamento = agregados["total_faturamento"]
+total_agendamentos_realizados = agregados["total_agendamentos_realizados"]
 ticket_medio = (
     total_faturamento / total_agendamentos_realizados
     if total_agendamentos_realizados > 0
@@ -120,21 +344,10 @@ st.markdown("---")
 # Pergunta 1: Qual o faturamento total por serviço e por profissional?
 st.subheader("Faturamento por Profissional e Serviço")
 if not df_realizado.empty:
-    fig_faturamento_prof = px.bar(
-        df_realizado,
-        x="Profissional",
-        y="Valor",
-        color="Serviço",
-        title="Faturamento por Profissional e Serviço",
-        labels={"Valor": "Faturamento (R$)", "Profissional": "Profissional"},
-        barmode="group",
-    )
-    fig_faturamento_prof.update_traces(
-        hovertemplate=(
-            "<b>Profissional:</b> %{x}<br>"
-            "<b>Serviço:</b> %{data.name}<br>"
-            "<b>Faturamento:</b> R$ %{y:,.2f}<extra></extra>"
-        )
+    fig_faturamento_prof = figuras.obter(
+        "faturamento_profissional",
+        df_realizado[["Profissional", "Serviço", "Valor"]],
+        figura_faturamento_profissional,
     )
     st.plotly_chart(fig_faturamento_prof, use_container_width=True)
 else:
@@ -146,19 +359,10 @@ st.markdown("---")
 # GRÁFICO DE FATURAMENTO POR SERVIÇO
 st.subheader("Faturamento por Serviço no Período")
 if not df_realizado.empty:
-    faturamento_por_servico = (
-        df_realizado.groupby("Serviço")["Valor"].sum().sort_values(ascending=True)
-    )
-    fig_faturamento_servico = px.bar(
-        faturamento_por_servico,
-        x=faturamento_por_servico.values,
-        y=faturamento_por_servico.index,
-        orientation="h",
-        title="Faturamento por Serviço no Período",
-        text_auto=True,
-        labels={"x": "Faturamento Total (R$)", "y": "Serviço"},
+    faturamento_por_servico = agregados["faturamento_por_servico"]
+    fig_faturamento_servico = figuras.obter(
+        "faturamento_servico", faturamento_por_servico, figura_faturamento_servico
     )
-    fig_faturamento_servico.update_layout(yaxis={"categoryorder": "total ascending"})
     st.plotly_chart(fig_faturamento_servico, use_container_width=True)
 else:
     st.info("Não há faturamento para exibir com os filtros atuais.")
@@ -171,26 +375,15 @@ st.subheader("Cancelamentos e Ausências")
 if not df_filtrado.empty:
     col_taxa1, col_taxa2 = st.columns(2)
     with col_taxa1:
-        status_counts = df_filtrado["Status_descrito"].value_counts()
-        fig_status_pizza = px.pie(
-            values=status_counts.values,
-            names=status_counts.index,
-            title="Distribuição Geral de Status dos Agendamentos",
-            hole=0.3,
-        )
+        status_counts = agregados["status_counts"]
+        fig_status_pizza = figuras.obter("status", status_counts, figura_status)
         st.plotly_chart(fig_status_pizza, use_container_width=True)
 
     with col_taxa2:
-        df_cancelados = df_filtrado[df_filtrado["Status_descrito"] == "Cancelado"]
-        if not df_cancelados.empty:
-            cancel_por_prof = df_cancelados["Profissional"].value_counts().reset_index()
-            cancel_por_prof.columns = ["Profissional", "Cancelamentos"]
-            fig_cancel_prof = px.bar(
-                cancel_por_prof,
-                x="Profissional",
-                y="Cancelamentos",
-                title="Total de Cancelamentos por Profissional",
-                text_auto=True,
+        cancel_por_prof = agregados["cancel_por_prof"]
+        if not cancel_por_prof.empty:
+            fig_cancel_prof = figuras.obter(
+                "cancelamentos", cancel_por_prof, figura_cancelamentos
             )
             st.plotly_chart(fig_cancel_prof, use_container_width=True)
         else:
@@ -210,26 +403,9 @@ if df_filtrado.empty:
 else:
     col_fluxo1, col_fluxo2 = st.columns(2)
     with col_fluxo1:
-        try:
-            df_filtrado_dia = df_filtrado.copy()
-            df_filtrado_dia["Dia da Semana"] = df_filtrado_dia["Data"].dt.day_name(
-                locale="pt_BR.utf8"
-            )
-        except Exception:
-            df_filtrado_dia["Dia da Semana"] = df_filtrado_dia["Data"].dt.day_name()
-
-        agend_por_dia = df_filtrado_dia["Dia da Semana"].value_counts()
+        agend_por_dia = agregados["agend_por_dia"]
         if not agend_por_dia.empty:
-            fig_fluxo_dia = px.bar(
-                agend_por_dia,
-                title="Agendamentos por Dia da Semana",
-                labels={
-                    "value": "Quantidade de Agendamentos",
-                    "index": "Dia da Semana",
-                },
-                text_auto=True,
-            )
-            fig_fluxo_dia.update_layout(xaxis={"categoryorder": "total descending"})
+            fig_fluxo_dia = figuras.obter("fluxo_dia", agend_por_dia, figura_fluxo_dia)
             st.plotly_chart(fig_fluxo_dia, use_container_width=True)
         else:
             st.info(
@@ -237,35 +413,11 @@ else:
             )
 
     with col_fluxo2:
-        horarios_validos = [
-            "09:00:00",
-            "09:40:00",
-            "10:20:00",
-            "11:00:00",
-            "13:00:00",
-            "13:40:00",
-            "14:20:00",
-            "15:00:00",
-            "15:40:00",
-            "16:20:00",
-            "17:00:00",
-            "17:40:00",
-            "18:20:00",
-            "19:00:00",
-        ]
-        df_filtrado_horas = df_filtrado.copy()
-        df_filtrado_horas["Horário"] = df_filtrado_horas["Horário"].astype(str)
-        df_horarios_filtrados = df_filtrado_horas[
-            df_filtrado_horas["Horário"].isin(horarios_validos)
-        ]
-        agend_por_hora = df_horarios_filtrados["Horário"].value_counts().sort_index()
+        agend_por_hora = agregados["agend_por_hora"]
 
         if not agend_por_hora.empty:
-            fig_fluxo_hora = px.bar(
-                agend_por_hora,
-                title="Agendamentos por Horário (Horas Selecionadas)",
-                labels={"value": "Quantidade de Agendamentos", "index": "Horário"},
-                text_auto=True,
+            fig_fluxo_hora = figuras.obter(
+                "fluxo_hora", agend_por_hora, figura_fluxo_hora
             )
             st.plotly_chart(fig_fluxo_hora, use_container_width=True)
         else:
@@ -276,12 +428,8 @@ st.markdown("---")
 # Pergunta 5: Quem são os clientes mais frequentes?
 st.subheader("Top Clientes por Período")
 if not df_realizado.empty:
-    df_clientes_reais = df_realizado[df_realizado["Cliente"] != "Sem Cadastro"]
-    if not df_clientes_reais.empty:
-        top_clientes = (
-            df_clientes_reais["Cliente"].value_counts().nlargest(10).reset_index()
-        )
-        top_clientes.columns = ["Cliente", "Nº de Visitas"]
+    top_clientes = agregados["top_clientes"]
+    if not top_clientes.empty:
         st.dataframe(top_clientes, use_container_width=True, hide_index=True)
     else:
         st.info(
@@ -4,7 +4,15 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 import os
+import sys
 from itertools import product
+from pathlib import Path
+
+# Permite importar o pacote compartilhado `dash_utils` (na raiz do repositório)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dash_utils.bitmap import IndiceBitmap
+from dash_utils.figuras import CacheFiguras
 
 # Configuração da página
 st.set_page_config(page_title="DASHBOARD DE ANÁLISE DE CRÉDITO", layout="wide")
@@ -46,129 +54,227 @@ def create_dataset():
     return df
 
 
-# Verificar se o arquivo já existe
-if not os.path.exists("base_credito_ficticia.csv"):
-    df = create_dataset()
-else:
-    df = pd.read_csv("base_credito_ficticia.csv")
+# Função para carregar o dataset e criar as colunas derivadas (em cache, para
+# não reler o CSV a cada interação)
+@st.cache_data
+def carregar_dados():
+    # Verificar se o arquivo já existe
+    if not os.path.exists("base_credito_ficticia.csv"):
+        df = create_dataset()
+    else:
+        df = pd.read_csv("base_credito_ficticia.csv")
 
-# Transformar textos em caixa alta
-for col in df.select_dtypes(include="object").columns:
-    df[col] = df[col].str.upper()
+    # Transformar textos em caixa alta
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = df[col].str.upper()
 
-# Criar coluna numérica para APROVADO
-df["APROVADO_NUM"] = df["APROVADO"].map({"APROVADO": 1, "REPROVADO": 0})
+    # Criar coluna numérica para APROVADO
+    df["APROVADO_NUM"] = df["APROVADO"].map({"APROVADO": 1, "REPROVADO": 0})
 
-# Criar faixas etárias
-df["FAIXA_ETARIA"] = pd.cut(
-    df["IDADE"],
-    bins=[18, 30, 40, 50, 60, 80],
-    labels=["18-30", "31-40", "41-50", "51-60", "61-80"],
-)
+    # Criar faixas etárias
+    df["FAIXA_ETARIA"] = pd.cut(
+        df["IDADE"],
+        bins=[18, 30, 40, 50, 60, 80],
+        labels=["18-30", "31-40", "41-50", "51-60", "61-80"],
+    )
 
-# Criar faixas de score
-df["FAIXA_SCORE"] = pd.cut(
-    df["SCORE_CREDITO"],
-    bins=[0, 300, 500, 700, 850, 1000],
-    labels=[
-        "Muito Baixo (300-499)",
-        "Baixo (500-699)",
-        "Médio (700-849)",
-        "Bom (850-999)",
-        "Excelente (1000)",
-    ],
-)
+    # Criar faixas de score
+    df["FAIXA_SCORE"] = pd.cut(
+        df["SCORE_CREDITO"],
+        bins=[0, 300, 500, 700, 850, 1000],
+        labels=[
+            "Muito Baixo (300-499)",
+            "Baixo (500-699)",
+            "Médio (700-849)",
+            "Bom (850-999)",
+            "Excelente (1000)",
+        ],
+    )
 
-# Criar razão valor solicitado / renda anual
-df["RAZAO_VALOR_RENDA"] = df["VALOR_SOLICITADO"] / (df["RENDA_MENSAL"] * 12)
+    # Criar razão valor solicitado / renda anual
+    df["RAZAO_VALOR_RENDA"] = df["VALOR_SOLICITADO"] / (df["RENDA_MENSAL"] * 12)
 
-# Título do Dashboard
-st.title("📊 DASHBOARD DE ANÁLISE DE CRÉDITO")
+    return df
 
-# Filtros interativos
-st.sidebar.header("🔍 FILTROS")
-estado_civil = st.sidebar.multiselect(
-    "ESTADO CIVIL",
-    options=df["ESTADO_CIVIL"].unique(),
-    default=df["ESTADO_CIVIL"].unique(),
-    help="Selecione os estados civis para análise",
-)
-emprego = st.sidebar.multiselect(
-    "TIPO DE EMPREGO",
-    options=df["EMPREGO"].unique(),
-    default=df["EMPREGO"].unique(),
-    help="Selecione os tipos de vínculo empregatício",
-)
-idade_range = st.sidebar.slider(
-    "FAIXA ETÁRIA",
-    min_value=int(df["IDADE"].min()),
-    max_value=int(df["IDADE"].max()),
-    value=(int(df["IDADE"].min()), int(df["IDADE"].max())),
-    help="Selecione a faixa etária desejada",
-)
-score_range = st.sidebar.slider(
-    "SCORE DE CRÉDITO",
-    min_value=int(df["SCORE_CREDITO"].min()),
-    max_value=int(df["SCORE_CREDITO"].max()),
-    value=(int(df["SCORE_CREDITO"].min()), int(df["SCORE_CREDITO"].max())),
-    help="Selecione o range de score desejado",
-)
 
-df_filtered = df[
-    df["ESTADO_CIVIL"].isin(estado_civil)
-    & df["EMPREGO"].isin(emprego)
-    & (df["IDADE"].between(idade_range[0], idade_range[1]))
-    & (df["SCORE_CREDITO"].between(score_range[0], score_range[1]))
-]
+# Índice de bitmaps das colunas dos filtros, compartilhado entre as sessões
+@st.cache_resource
+def criar_indice_filtros():
+    return IndiceBitmap(carregar_dados(), ["ESTADO_CIVIL", "EMPREGO", "IDADE"])
 
-# Verificação de dados filtrados
-if df_filtered.empty:
-    st.warning(
-        "⚠️ Nenhum dado encontrado com os filtros atuais. Ajuste os filtros e tente novamente."
+
+# Figuras Plotly prontas, compartilhadas entre as sessões: um filtro que não
+# muda o dado de um gráfico não monta a figura de novo
+@st.cache_resource
+def abrir_cache_figuras():
+    return CacheFiguras(max_figuras=64)
+
+
+# Funções para montar as figuras das abas; cada uma recebe só as colunas (ou o
+# agregado) que o gráfico usa, que formam a chave do cache
+def figura_faixa_etaria(dados):
+    fig = px.pie(
+        dados,
+        names="FAIXA_ETARIA",
+        hole=0.3,
+        color_discrete_sequence=px.colors.sequential.RdBu,
+        labels={"FAIXA_ETARIA": "Faixa Etária"},
+        title="Distribuição Percentual por Faixa Etária",
+    )
+    fig.update_traces(textposition="inside", textinfo="percent+label")
+    return fig
+
+
+def figura_aprovacao_estado_emprego(pivot):
+    return px.imshow(
+        pivot,
+        text_auto=True,
+        aspect="auto",
+        color_continuous_scale="Blues",
+        labels=dict(x="Tipo de Emprego", y="Estado Civil", color="Taxa de Aprovação"),
+        title="Taxa de Aprovação (%) por Estado Civil e Tipo de Emprego",
     )
-    st.stop()
 
-# Seção de KPIs
-st.header("📈 VISÃO GERAL")
-col1, col2, col3, col4 = st.columns(4)
-col1.metric("👥 Total de Clientes", f"{len(df_filtered):,}".replace(",", "."))
-col2.metric(
-    "✅ Taxa de Aprovação",
-    f"{df_filtered['APROVADO_NUM'].mean():.1%}",
-    help="Percentual de clientes aprovados no crédito",
-)
-col3.metric(
-    "⚠️ Inadimplência",
-    f"{df_filtered['HISTORICO_INADIMPLENCIA'].eq('SIM').mean():.1%}",
-    help="Percentual de clientes com histórico de inadimplência",
-)
-col4.metric(
-    "🏆 Score Médio",
-    f"{df_filtered['SCORE_CREDITO'].mean():.0f}",
-    help="Média do score de crédito dos clientes filtrados",
-)
 
-# Abas para diferentes análises
-tab1, tab2, tab3 = st.tabs(
-    ["👥 Análise Demográfica", "💰 Análise Financeira", "📉 Risco de Crédito"]
-)
+def figura_score_faixa_etaria(dados):
+    fig = px.box(
+        dados,
+        x="FAIXA_ETARIA",
+        y="SCORE_CREDITO",
+        color="APROVADO",
+        color_discrete_map={"APROVADO": "green", "REPROVADO": "red"},
+        labels={"FAIXA_ETARIA": "Faixa Etária", "SCORE_CREDITO": "Score de Crédito"},
+        title="Distribuição de Scores de Crédito por Faixa Etária e Status de Aprovação",
+    )
+    fig.update_layout(boxmode="group")
+    return fig
+
+
+def figura_renda_valor(dados):
+    fig = px.scatter(
+        dados,
+        x="RENDA_MENSAL",
+        y="VALOR_SOLICITADO",
+        color="APROVADO",
+        color_discrete_map={"APROVADO": "green", "REPROVADO": "red"},
+        trendline="lowess",
+        opacity=0.7,
+        hover_data=["SCORE_CREDITO", "IDADE", "EMPREGO"],
+        labels={
+            "RENDA_MENSAL": "Renda Mensal (R$)",
+            "VALOR_SOLICITADO": "Valor Solicitado (R$)",
+            "APROVADO": "Status",
+        },
+        title="Relação entre Renda Mensal e Valor Solicitado",
+    )
+    fig.update_layout(legend_title_text="Status de Aprovação")
+    return fig
+
+
+def figura_razao_valor_renda(dados):
+    fig = px.histogram(
+        dados,
+        x="RAZAO_VALOR_RENDA",
+        color="APROVADO",
+        color_discrete_map={"APROVADO": "green", "REPROVADO": "red"},
+        nbins=30,
+        barmode="overlay",
+        opacity=0.6,
+        labels={
+            "RAZAO_VALOR_RENDA": "Razão (Valor Solicitado / Renda Anual)",
+            "count": "Número de Clientes",
+        },
+        title="Distribuição da Razão entre Valor Solicitado e Renda Anual",
+    )
+    fig.add_vline(
+        x=5,
+        line_dash="dash",
+        line_color="red",
+        annotation_text="Limite Recomendado (5x)",
+        annotation_position="top",
+    )
+    fig.update_layout(legend_title_text="Status de Aprovação")
+    return fig
+
+
+def figura_divida_score(dados):
+    fig = px.scatter(
+        dados,
+        x="DIVIDA_ATUAL",
+        y="SCORE_CREDITO",
+        color="APROVADO",
+        color_discrete_map={"APROVADO": "green", "REPROVADO": "red"},
+        size="VALOR_SOLICITADO",
+        hover_name="EMPREGO",
+        opacity=0.7,
+        labels={
+            "DIVIDA_ATUAL": "Dívida Atual (R$)",
+            "SCORE_CREDITO": "Score de Crédito",
+            "VALOR_SOLICITADO": "Valor Solicitado (R$)",
+            "APROVADO": "Status",
+        },
+        title="Relação entre Dívida Atual e Score de Crédito",
+    )
+    fig.update_layout(legend_title_text="Status de Aprovação")
+    return fig
+
+
+def figura_inadimplencia_segmento(complete_df):
+    return px.sunburst(
+        complete_df,
+        path=["FAIXA_ETARIA", "EMPREGO", "HISTORICO_INADIMPLENCIA"],
+        values="COUNT",
+        color="HISTORICO_INADIMPLENCIA",
+        color_discrete_map={"SIM": "#FF7F0E", "NÃO": "#1F77B4"},
+        branchvalues="total",
+        title="Distribuição Hierárquica da Inadimplência",
+        labels={"COUNT": "Número de Clientes"},
+    )
+
+
+def figura_score_categoria(dados):
+    fig = px.violin(
+        dados,
+        x="FAIXA_SCORE",
+        y="SCORE_CREDITO",
+        color="APROVADO",
+        color_discrete_map={"APROVADO": "green", "REPROVADO": "red"},
+        box=True,
+        points="all",
+        labels={
+            "FAIXA_SCORE": "Categoria de Score",
+            "SCORE_CREDITO": "Score de Crédito",
+            "APROVADO": "Status",
+        },
+        title="Distribuição de Scores por Categoria e Status de Aprovação",
+    )
+    fig.update_layout(legend_title_text="Status de Aprovação")
+    return fig
+
 
-with tab1:
+def figura_correlacao(corr):
+    return px.imshow(
+        corr,
+        text_auto=True,
+        aspect="auto",
+        color_continuous_scale="RdBu",
+        range_color=[-1, 1],
+        title="Correlação entre Variáveis Numéricas",
+    )
+
+
+# Aba de análise demográfica
+@st.fragment
+def exibir_analise_demografica(df_filtered):
     st.header("👥 Análise Demográfica")
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Distribuição por Faixa Etária")
-        fig = px.pie(
-            df_filtered,
-            names="FAIXA_ETARIA",
-            hole=0.3,
-            color_discrete_sequence=px.colors.sequential.RdBu,
-            labels={"FAIXA_ETARIA": "Faixa Etária"},
-            title="Distribuição Percentual por Faixa Etária",
+        fig = figuras.obter(
+            "faixa_etaria", df_filtered[["FAIXA_ETARIA"]], figura_faixa_etaria
         )
-        fig.update_traces(textposition="inside", textinfo="percent+label")
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
@@ -180,15 +286,8 @@ with tab1:
                 values="APROVADO_NUM",
                 aggfunc="mean",
             )
-            fig = px.imshow(
-                pivot,
-                text_auto=True,
-                aspect="auto",
-                color_continuous_scale="Blues",
-                labels=dict(
-                    x="Tipo de Emprego", y="Estado Civil", color="Taxa de Aprovação"
-                ),
-                title="Taxa de Aprovação (%) por Estado Civil e Tipo de Emprego",
+            fig = figuras.obter(
+                "aprovacao_estado_emprego", pivot, figura_aprovacao_estado_emprego
             )
             st.plotly_chart(fig, use_container_width=True)
         except Exception as e:
@@ -197,92 +296,62 @@ with tab1:
             )
 
     st.subheader("Distribuição de Scores por Faixa Etária")
-    fig = px.box(
-        df_filtered,
-        x="FAIXA_ETARIA",
-        y="SCORE_CREDITO",
-        color="APROVADO",
-        color_discrete_map={"APROVADO": "green", "REPROVADO": "red"},
-        labels={"FAIXA_ETARIA": "Faixa Etária", "SCORE_CREDITO": "Score de Crédito"},
-        title="Distribuição de Scores de Crédito por Faixa Etária e Status de Aprovação",
+    fig = figuras.obter(
+        "score_faixa_etaria",
+        df_filtered[["FAIXA_ETARIA", "SCORE_CREDITO", "APROVADO"]],
+        figura_score_faixa_etaria,
     )
-    fig.update_layout(boxmode="group")
     st.plotly_chart(fig, use_container_width=True)
 
-with tab2:
+
+# Aba de análise financeira
+@st.fragment
+def exibir_analise_financeira(df_filtered):
     st.header("💰 Análise Financeira")
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Renda vs. Valor Solicitado")
-        fig = px.scatter(
-            df_filtered,
-            x="RENDA_MENSAL",
-            y="VALOR_SOLICITADO",
-            color="APROVADO",
-            color_discrete_map={"APROVADO": "green", "REPROVADO": "red"},
-            trendline="lowess",
-            opacity=0.7,
-            hover_data=["SCORE_CREDITO", "IDADE", "EMPREGO"],
-            labels={
-                "RENDA_MENSAL": "Renda Mensal (R$)",
-                "VALOR_SOLICITADO": "Valor Solicitado (R$)",
-                "APROVADO": "Status",
-            },
-            title="Relação entre Renda Mensal e Valor Solicitado",
+        fig = figuras.obter(
+            "renda_valor",
+            df_filtered[
+                [
+                    "RENDA_MENSAL",
+                    "VALOR_SOLICITADO",
+                    "APROVADO",
+                    "SCORE_CREDITO",
+                    "IDADE",
+                    "EMPREGO",
+                ]
+            ],
+            figura_renda_valor,
         )
-        fig.update_layout(legend_title_text="Status de Aprovação")
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
         st.subheader("Razão Valor Solicitado/Renda Anual")
-        fig = px.histogram(
-            df_filtered,
-            x="RAZAO_VALOR_RENDA",
-            color="APROVADO",
-            color_discrete_map={"APROVADO": "green", "REPROVADO": "red"},
-            nbins=30,
-            barmode="overlay",
-            opacity=0.6,
-            labels={
-                "RAZAO_VALOR_RENDA": "Razão (Valor Solicitado / Renda Anual)",
-                "count": "Número de Clientes",
-            },
-            title="Distribuição da Razão entre Valor Solicitado e Renda Anual",
+        fig = figuras.obter(
+            "razao_valor_renda",
+            df_filtered[["RAZAO_VALOR_RENDA", "APROVADO"]],
+            figura_razao_valor_renda,
         )
-        fig.add_vline(
-            x=5,
-            line_dash="dash",
-            line_color="red",
-            annotation_text="Limite Recomendado (5x)",
-            annotation_position="top",
-        )
-        fig.update_layout(legend_title_text="Status de Aprovação")
         st.plotly_chart(fig, use_container_width=True)
 
     st.subheader("Dívida Atual vs. Score de Crédito")
-    fig = px.scatter(
-        df_filtered,
-        x="DIVIDA_ATUAL",
-        y="SCORE_CREDITO",
-        color="APROVADO",
-        color_discrete_map={"APROVADO": "green", "REPROVADO": "red"},
-        size="VALOR_SOLICITADO",
-        hover_name="EMPREGO",
-        opacity=0.7,
-        labels={
-            "DIVIDA_ATUAL": "Dívida Atual (R$)",
-            "SCORE_CREDITO": "Score de Crédito",
-            "VALOR_SOLICITADO": "Valor Solicitado (R$)",
-            "APROVADO": "Status",
-        },
-        title="Relação entre Dívida Atual e Score de Crédito",
+    fig = figuras.obter(
+        "divida_score",
+        df_filtered[
+            ["DIVIDA_ATUAL", "SCORE_CREDITO", "APROVADO", "VALOR_SOLICITADO", "EMPREGO"]
+        ],
+        figura_divida_score,
     )
-    fig.update_layout(legend_title_text="Status de Aprovação")
     st.plotly_chart(fig, use_container_width=True)
 
-with tab3:
+
+# Aba de análise de risco
+@st.fragment
+def exibir_analise_risco(df_filtered):
     st.header("📉 Análise de Risco")
 
     col1, col2 = st.columns(2)
@@ -313,15 +382,8 @@ with tab3:
         complete_df = complete_df.merge(sunburst_df, how="left").fillna(0)
 
         if len(complete_df) > 0:
-            fig = px.sunburst(
-                complete_df,
-                path=["FAIXA_ETARIA", "EMPREGO", "HISTORICO_INADIMPLENCIA"],
-                values="COUNT",
-                color="HISTORICO_INADIMPLENCIA",
-                color_discrete_map={"SIM": "#FF7F0E", "NÃO": "#1F77B4"},
-                branchvalues="total",
-                title="Distribuição Hierárquica da Inadimplência",
-                labels={"COUNT": "Número de Clientes"},
+            fig = figuras.obter(
+                "inadimplencia_segmento", complete_df, figura_inadimplencia_segmento
             )
             st.plotly_chart(fig, use_container_width=True)
         else:
@@ -330,40 +392,126 @@ with tab3:
     with col2:
         st.subheader("Score de Crédito por Categoria")
         if not df_filtered.empty:
-            fig = px.violin(
-                df_filtered,
-                x="FAIXA_SCORE",
-                y="SCORE_CREDITO",
-                color="APROVADO",
-                color_discrete_map={"APROVADO": "green", "REPROVADO": "red"},
-                box=True,
-                points="all",
-                labels={
-                    "FAIXA_SCORE": "Categoria de Score",
-                    "SCORE_CREDITO": "Score de Crédito",
-                    "APROVADO": "Status",
-                },
-                title="Distribuição de Scores por Categoria e Status de Aprovação",
+            fig = figuras.obter(
+                "score_categoria",
+                df_filtered[["FAIXA_SCORE", "SCORE_CREDITO", "APROVADO"]],
+                figura_score_categoria,
             )
-            fig.update_layout(legend_title_text="Status de Aprovação")
             st.plotly_chart(fig, use_container_width=True)
 
     st.subheader("Matriz de Correlação entre Variáveis")
     numeric_cols = df_filtered.select_dtypes(include=["int64", "float64"]).columns
     if len(numeric_cols) > 0:
         corr = df_filtered[numeric_cols].corr()
-        fig = px.imshow(
-            corr,
-            text_auto=True,
-            aspect="auto",
-            color_continuous_scale="RdBu",
-            range_color=[-1, 1],
-            title="Correlação entre Variáveis Numéricas",
-        )
+        fig = figuras.obter("correlacao", corr, figura_correlacao)
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.warning("Nenhuma coluna numérica para calcular correlação.")
 
+
+# Análises disponíveis, na ordem em que aparecem no seletor
+ABAS = {
+    "👥 Análise Demográfica": exibir_analise_demografica,
+    "💰 Análise Financeira": exibir_analise_financeira,
+    "📉 Risco de Crédito": exibir_analise_risco,
+}
+
+
+# Seletor das análises. Ao contrário de `st.tabs`, que executa o conteúdo de
+# todas as abas a cada interação, só a análise visível é montada; trocar de
+# análise reexecuta apenas este fragmento, sem refazer filtros e KPIs
+@st.fragment
+def exibir_analises(df_filtered):
+    aba = st.radio(
+        "Análise",
+        options=list(ABAS),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="aba_analise",
+    )
+    ABAS[aba](df_filtered)
+
+
+df = carregar_dados()
+indice_filtros = criar_indice_filtros()
+figuras = abrir_cache_figuras()
+
+# Título do Dashboard
+st.title("📊 DASHBOARD DE ANÁLISE DE CRÉDITO")
+
+# Filtros interativos
+st.sidebar.header("🔍 FILTROS")
+estado_civil = st.sidebar.multiselect(
+    "ESTADO CIVIL",
+    options=df["ESTADO_CIVIL"].unique(),
+    default=df["ESTADO_CIVIL"].unique(),
+    help="Selecione os estados civis para análise",
+)
+emprego = st.sidebar.multiselect(
+    "TIPO DE EMPREGO",
+    options=df["EMPREGO"].unique(),
+    default=df["EMPREGO"].unique(),
+    help="Selecione os tipos de vínculo empregatício",
+)
+idade_range = st.sidebar.slider(
+    "FAIXA ETÁRIA",
+    min_value=int(df["IDADE"].min()),
+    max_value=int(df["IDADE"].max()),
+    value=(int(df["IDADE"].min()), int(df["IDADE"].max())),
+    help="Selecione a faixa etária desejada",
+)
+score_range = st.sidebar.slider(
+    "SCORE DE CRÉDITO",
+    min_value=int(df["SCORE_CREDITO"].min()),
+    max_value=int(df["SCORE_CREDITO"].max()),
+    value=(int(df["SCORE_CREDITO"].min()), int(df["SCORE_CREDITO"].max())),
+    help="Selecione o range de score desejado",
+)
+
+# Estado civil, emprego e idade são resolvidos pelo índice de bitmaps; o score
+# tem valores demais para um bitmap por valor e segue como comparação
+selecao = {
+    "ESTADO_CIVIL": estado_civil,
+    "EMPREGO": emprego,
+    "IDADE": indice_filtros.valores_entre("IDADE", *idade_range),
+}
+df_filtered = df[
+    indice_filtros.mascara(selecao)
+    & (df["SCORE_CREDITO"].between(score_range[0], score_range[1]))
+]
+
+# Verificação de dados filtrados
+if df_filtered.empty:
+    st.warning(
+        "⚠️ Nenhum dado encontrado com os filtros atuais. Ajuste os filtros e tente novamente."
+    )
+    st.stop()
+
+# Seção de KPIs
+st.header("📈 VISÃO GERAL")
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("👥 Total de Clientes", f"{len(df_filtered):,}".replace(",", "."))
+col2.metric(
+    "✅ Taxa de Aprovação",
+    f"{df_filtered['APROVADO_NUM'].mean():.1%}",
+    help="Percentual de clientes aprovados no crédito",
+)
+col3.metric(
+    "⚠️ Inadimplência",
+    f"{df_filtered['HISTORICO_INADIMPLENCIA'].eq('SIM').mean():.1%}",
+    help="Percentual de clientes com histórico de inadimplência",
+)
+col4.metric(
+    "🏆 Score Médio",
+    f"{df_filtered['SCORE_CREDITO'].mean():.0f}",
+    help="Média do score de crédito dos clientes filtrados",
+)
+
+
+# Análises por aba: só a selecionada é montada a cada execução
+exibir_analises(df_filtered)
+
+
 # Rodapé
 st.sidebar.markdown("---")
 st.sidebar.markdown("**Dashboard de Análise de Crédito**")
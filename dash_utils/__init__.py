@@ -0,0 +1,6 @@
+"""
+Utilitários compartilhados pelos dashboards Streamlit do repositório.
+
+Os dashboards ficam em pastas diferentes; para importar este pacote eles
+adicionam a raiz do repositório ao `sys.path`.
+"""
@@ -0,0 +1,108 @@
+"""
+Índice de bitmaps para os filtros de seleção múltipla dos dashboards.
+
+Para cada coluna de baixa cardinalidade o índice guarda um bitmap por valor
+distinto (1 bit por linha, compactado com `np.packbits`). Uma seleção é
+resolvida com operações bit a bit: OU entre os valores escolhidos de uma
+coluna e E entre as colunas, sem comparar textos a cada interação.
+
+Colunas com todos os valores selecionados só restringem as linhas com valor
+ausente; quando mais da metade dos valores está selecionada, o OU é feito
+sobre os não selecionados e o resultado é invertido. Valores ausentes (NaN)
+não têm bitmap e nunca entram no filtro (como em `Series.isin`): nas colunas
+que os têm, o índice guarda também o bitmap das linhas não nulas, combinado
+com E nesses dois casos.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class IndiceBitmap:
+    """
+    Índice das `colunas` de `df`. As posições dos bits seguem a ordem das
+    linhas de `df`, então o índice só vale para esse DataFrame (ou cópias dele
+    com a mesma ordem de linhas). O índice não muda depois de criado e pode
+    ser compartilhado entre sessões (`st.cache_resource`).
+    """
+
+    def __init__(self, df, colunas):
+        self.num_linhas = len(df)
+        self.bitmaps = {}
+        # Linhas com valor (não nulo) das colunas que têm valores ausentes
+        self.nao_nulos = {}
+        for coluna in colunas:
+            codigos, valores = pd.factorize(df[coluna], sort=True)
+            self.bitmaps[coluna] = {
+                valor: np.packbits(codigos == codigo)
+                for codigo, valor in enumerate(valores.tolist())
+            }
+            if (codigos < 0).any():
+                self.nao_nulos[coluna] = np.packbits(codigos >= 0)
+
+    def valores(self, coluna):
+        """Valores distintos (e não nulos) da coluna, em ordem crescente."""
+        return list(self.bitmaps[coluna])
+
+    def valores_entre(self, coluna, minimo, maximo):
+        """Valores da coluna no intervalo [minimo, maximo], para filtros de faixa."""
+        return [valor for valor in self.bitmaps[coluna] if minimo <= valor <= maximo]
+
+    def selecionar(self, selecao):
+        """
+        Retorna o bitmap compactado das linhas que atendem à `selecao`
+        (coluna -> valores aceitos), ou None se nenhuma coluna restringir as
+        linhas. Os bits além de `num_linhas` não têm significado.
+        """
+        resultado = None
+        for coluna, aceitos in selecao.items():
+            bitmaps = self.bitmaps[coluna]
+            aceitos = set(aceitos)
+            recusados = [valor for valor in bitmaps if valor not in aceitos]
+            nao_nulos = self.nao_nulos.get(coluna)
+            if not recusados:
+                if nao_nulos is None:
+                    continue
+                bits = nao_nulos.copy()
+            else:
+                inverter = len(recusados) < len(bitmaps) - len(recusados)
+                escolhidos = recusados if inverter else bitmaps.keys() & aceitos
+                bits = np.zeros((self.num_linhas + 7) // 8, dtype=np.uint8)
+                for valor in escolhidos:
+                    np.bitwise_or(bits, bitmaps[valor], out=bits)
+                if inverter:
+                    # A inversão marcaria também as linhas com valor ausente
+                    np.invert(bits, out=bits)
+                    if nao_nulos is not None:
+                        np.bitwise_and(bits, nao_nulos, out=bits)
+
+            if resultado is None:
+                resultado = bits
+            else:
+                np.bitwise_and(resultado, bits, out=resultado)
+        return resultado
+
+    def mascara(self, selecao):
+        """Máscara booleana (uma posição por linha) da `selecao`."""
+        bits = self.selecionar(selecao)
+        if bits is None:
+            return np.ones(self.num_linhas, dtype=bool)
+        return np.unpackbits(bits, count=self.num_linhas).view(bool)
+
+    def contar(self, selecao):
+        """Número de linhas que atendem à `selecao`, sem montar a máscara."""
+        bits = self.selecionar(selecao)
+        if bits is None:
+            return self.num_linhas
+        # Zera os bits de preenchimento do último byte antes de contar
+        sobra = -self.num_linhas % 8
+        if sobra:
+            bits[-1] &= 0xFF << sobra & 0xFF
+        return int(np.bitwise_count(bits).sum())
+
+    def filtrar(self, df, selecao):
+        """Linhas de `df` que atendem à `selecao`."""
+        bits = self.selecionar(selecao)
+        if bits is None:
+            return df
+        return df[np.unpackbits(bits, count=self.num_linhas).view(bool)]
@@ -0,0 +1,138 @@
+"""
+Tabela de agregados por cliente, para o ranking de clientes dos dashboards.
+
+A tabela guarda, para cada cliente (pela chave, ex.: `ID_Cliente`), a soma e o
+número de vendas em cada célula dos filtros (ex.: Ano x Trimestre x
+Categoria). As entradas ficam ordenadas por célula: uma seleção de filtros
+vira alguns trechos contíguos da tabela, somados por cliente com
+`np.bincount`. O Top-N sai de uma ordenação parcial (`np.argpartition`), sem
+ordenar todos os clientes.
+
+Os filtros e a chave do cliente são convertidos em códigos inteiros
+(`pd.factorize`, uma vez na criação): a tabela é montada sem `groupby` e sem
+comparar textos.
+"""
+
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+
+class TabelaClientes:
+    """
+    Criada a partir de `df`, com as colunas dos `filtros`, a `chave` e o
+    `nome` do cliente e a `medida`. Não muda depois de criada e pode ser
+    compartilhada entre sessões (`st.cache_resource`).
+
+    Com `ler_nomes`, o nome não precisa estar em `df`: é uma função que recebe
+    as linhas da base (posições) da primeira venda de cada cliente e devolve
+    um array com seus nomes, chamada só por `top`, para os clientes do ranking.
+    """
+
+    def __init__(
+        self,
+        df,
+        filtros,
+        chave="ID_Cliente",
+        nome="Nome_Cliente",
+        medida="Total_Venda",
+        ler_nomes=None,
+    ):
+        self.filtros = list(filtros)
+        self.chave, self.nome, self.medida = chave, nome, medida
+        codigos, self.rotulos_filtros = [], []
+        for filtro in self.filtros:
+            codigos_filtro, rotulos = pd.factorize(df[filtro], sort=True)
+            codigos.append(codigos_filtro)
+            self.rotulos_filtros.append(pd.Index(rotulos, name=filtro))
+        cliente, clientes = pd.factorize(df[chave], sort=True)
+        self.clientes = pd.Index(clientes, name=chave)
+        tamanhos = [len(rotulos) for rotulos in self.rotulos_filtros]
+        self.num_celulas = int(np.prod(tamanhos))
+
+        validas = np.logical_and.reduce([c >= 0 for c in [cliente, *codigos]])
+        celula = np.ravel_multi_index([c[validas] for c in codigos], tamanhos)
+
+        # Uma entrada por (célula, cliente), em ordem de célula
+        entrada, posicao = np.unique(
+            celula * len(self.clientes) + cliente[validas], return_inverse=True
+        )
+        self.entrada_cliente = entrada % len(self.clientes)
+        self.entrada_soma = np.bincount(
+            posicao,
+            weights=df[medida].to_numpy(dtype="float64")[validas],
+            minlength=len(entrada),
+        )
+        self.entrada_vendas = np.bincount(posicao, minlength=len(entrada))
+        self.inicio_celula = np.searchsorted(
+            entrada // len(self.clientes), np.arange(self.num_celulas + 1)
+        )
+
+        # Nome de cada cliente (o da primeira venda)
+        _, primeira = np.unique(cliente, return_index=True)
+        self.primeira_venda = primeira[cliente[primeira] >= 0]
+        self.ler_nomes = ler_nomes
+        if ler_nomes is None:
+            self.nomes = df[nome].to_numpy()[self.primeira_venda]
+
+    # Função para listar as células que atendem à seleção
+    def _celulas(self, selecao):
+        aceitos = []
+        for filtro, rotulos in zip(self.filtros, self.rotulos_filtros):
+            if filtro in selecao:
+                aceitos.append(np.flatnonzero(rotulos.isin(selecao[filtro])))
+            else:
+                aceitos.append(np.arange(len(rotulos)))
+        tamanhos = [len(rotulos) for rotulos in self.rotulos_filtros]
+        return [np.ravel_multi_index(c, tamanhos) for c in product(*aceitos)]
+
+    def totais(self, selecao):
+        """
+        Soma e número de vendas de cada cliente (arrays indexados pelo código
+        do cliente) nas células que atendem à `selecao` (filtro -> valores).
+        """
+        trechos = [
+            slice(self.inicio_celula[c], self.inicio_celula[c + 1])
+            for c in self._celulas(selecao)
+        ]
+        cliente = np.concatenate([self.entrada_cliente[t] for t in trechos] or [[]])
+        cliente = cliente.astype(np.int64)
+        soma = np.concatenate([self.entrada_soma[t] for t in trechos] or [[]])
+        vendas = np.concatenate([self.entrada_vendas[t] for t in trechos] or [[]])
+        return (
+            np.bincount(cliente, weights=soma, minlength=len(self.clientes)),
+            np.bincount(cliente, weights=vendas, minlength=len(self.clientes)),
+        )
+
+    def clientes_unicos(self, selecao):
+        """Número de clientes com alguma venda na `selecao`."""
+        _, vendas = self.totais(selecao)
+        return int(np.count_nonzero(vendas))
+
+    def top(self, selecao, n=5):
+        """
+        Os `n` clientes com maior soma da medida na `selecao`, em ordem
+        decrescente (empates pela chave do cliente). Retorna um DataFrame com
+        a chave, o nome e a medida.
+        """
+        soma, vendas = self.totais(selecao)
+        candidatos = np.flatnonzero(vendas)
+        if len(candidatos) > n:
+            parte = np.argpartition(-soma[candidatos], n - 1)[:n]
+            # Inclui quem empata com o último lugar, para desempatar pela chave
+            corte = soma[candidatos[parte]].min()
+            candidatos = candidatos[soma[candidatos] >= corte]
+        ordem = np.lexsort((candidatos, -soma[candidatos]))[:n]
+        escolhidos = candidatos[ordem]
+        if self.ler_nomes is None:
+            nomes = self.nomes[escolhidos]
+        else:
+            nomes = self.ler_nomes(self.primeira_venda[escolhidos])
+        return pd.DataFrame(
+            {
+                self.chave: self.clientes[escolhidos],
+                self.nome: nomes,
+                self.medida: soma[escolhidos],
+            }
+        )
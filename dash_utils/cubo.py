@@ -0,0 +1,61 @@
+"""
+Cubo OLAP pré-agregado para os filtros dos dashboards.
+
+O cubo agrupa a base uma única vez por todas as dimensões de interesse e
+guarda as medidas somadas (ex.: soma de vendas, soma de quantidade e número
+de linhas). Cada consulta filtra e soma as células do cubo em vez das linhas
+da base: como o número de células é limitado pelas combinações de dimensões,
+o custo não cresce com o tamanho da base.
+
+Para cada agrupamento usado pelos gráficos ("rollup") é guardada também uma
+versão do cubo só com as dimensões de filtro e as do agrupamento, que é bem
+menor que o cubo completo.
+"""
+
+import numpy as np
+
+
+class CuboOLAP:
+    """
+    `dimensoes`: colunas que definem as células do cubo.
+    `medidas`: agregações no formato de `DataFrame.agg` com nome, ex.:
+        {"Total_Venda": ("Total_Venda", "sum"), "Vendas": ("Total_Venda", "size")}.
+        Devem ser aditivas (somas e contagens), pois as consultas as somam.
+    `filtros`: dimensões usadas nos filtros, mantidas em todos os rollups.
+    `rollups`: agrupamentos pré-calculados, ex.: [("Produto",), ("Ano", "Mês")].
+
+    O cubo é montado no construtor e não muda depois, então pode ser
+    compartilhado entre sessões (`st.cache_resource`).
+    """
+
+    def __init__(self, df, dimensoes, medidas, filtros, rollups=()):
+        self.dimensoes = list(dimensoes)
+        self.medidas = list(medidas)
+        self.filtros = list(filtros)
+        self.celulas = (
+            df.groupby(self.dimensoes, observed=True).agg(**medidas).reset_index()
+        )
+        self._rollups = {
+            tuple(por): self._agrupar(self.celulas, [*self.filtros, *por])
+            for por in [(), *rollups]
+        }
+
+    def _agrupar(self, tabela, por):
+        por = list(dict.fromkeys(por))  # Remove repetidas, mantendo a ordem
+        return tabela.groupby(por, observed=True)[self.medidas].sum().reset_index()
+
+    def consultar(self, selecao, por=()):
+        """
+        Soma as medidas das células que atendem à `selecao` (dimensão ->
+        valores aceitos). Sem `por`, retorna uma Series com os totais; com
+        `por`, um DataFrame com as medidas agrupadas por essas dimensões.
+        """
+        tabela = self._rollups.get(tuple(por), self.celulas)
+        mascara = np.ones(len(tabela), dtype=bool)
+        for dimensao, valores in selecao.items():
+            mascara &= tabela[dimensao].isin(valores).to_numpy()
+        filtrado = tabela[mascara]
+
+        if not por:
+            return filtrado[self.medidas].sum()
+        return self._agrupar(filtrado, por)[[*dict.fromkeys(por), *self.medidas]]
@@ -0,0 +1,71 @@
+"""
+Cache das figuras Plotly dos dashboards, pelo dado de entrada de cada gráfico.
+
+Montar uma figura com o `plotly.express` (agrupar os dados, criar e validar os
+traces) custa bem mais que exibi-la. O cache guarda a figura pronta com a
+chave formada pelo nome do gráfico e pelo hash do seu dado de entrada: se uma
+interação não muda o dado de um gráfico (ex.: um filtro que não o afeta), a
+figura é reaproveitada sem passar de novo pelo Plotly.
+
+O hash cobre todas as linhas, o índice, os nomes e os tipos das colunas (o
+`st.cache_*` do Streamlit só usa uma amostra das linhas em DataFrames
+grandes). As figuras são compartilhadas entre as sessões e não devem ser
+alteradas depois de criadas: todo ajuste (`update_layout` etc.) vai na função
+que cria a figura.
+"""
+
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def hash_dados(dados):
+    """Hash do dado de entrada de um gráfico (DataFrame, série ou outro objeto)."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(dados, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(dados, index=True).to_numpy())
+        quadro = dados.to_frame() if isinstance(dados, pd.Series) else dados
+        estrutura = [
+            dados.index.name,
+            [str(coluna) for coluna in quadro.columns],
+            [str(tipo) for tipo in quadro.dtypes],
+        ]
+        digest.update(repr(estrutura).encode("utf-8"))
+    else:
+        digest.update(pickle.dumps(dados, pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+class CacheFiguras:
+    """
+    Até `max_figuras` figuras em memória; ao passar do limite, sai a usada há
+    mais tempo (LRU). Pode ser compartilhado entre sessões
+    (`st.cache_resource`).
+    """
+
+    def __init__(self, max_figuras=128):
+        self.max_figuras = max_figuras
+        self._figuras = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, grafico, dados, criar):
+        """
+        Figura do `grafico` para os `dados`; se não estiver no cache, chama
+        `criar(dados)` e guarda o resultado. `criar` só deve depender de
+        `dados`, que é o que entra na chave.
+        """
+        chave = (grafico, hash_dados(dados))
+        with self._trava:
+            if chave in self._figuras:
+                self._figuras.move_to_end(chave)
+                return self._figuras[chave]
+        figura = criar(dados)
+        with self._trava:
+            self._figuras[chave] = figura
+            self._figuras.move_to_end(chave)
+            while len(self._figuras) > self.max_figuras:
+                self._figuras.popitem(last=False)
+        return figura
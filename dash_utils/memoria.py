@@ -0,0 +1,89 @@
+"""
+Medição da memória de cada sessão dos dashboards.
+
+A base de cada dashboard fica em `st.cache_resource`: um único DataFrame na
+memória do servidor, usado por todas as sessões sem cópia e com as colunas
+marcadas como somente leitura (`somente_leitura`). Cada sessão guarda só os
+resultados dos seus filtros; estas funções medem essas duas partes para
+mostrar no próprio dashboard. A base é medida uma vez, ao ser carregada; a
+cada interação só os resultados da sessão são medidos.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+MB = 1024 * 1024
+
+
+def tamanho_memoria(*objetos, profundo=False):
+    """
+    Memória, em bytes, alocada para os `objetos`: DataFrames, séries, arrays
+    NumPy e dicionários, listas e tuplas deles. Sem `profundo`, textos em
+    colunas `object` contam só o ponteiro, pois num resultado filtrado o objeto
+    do texto é o mesmo da base de origem.
+    """
+    total = 0
+    for objeto in objetos:
+        if isinstance(objeto, (pd.DataFrame, pd.Series, pd.Index)):
+            total += int(np.sum(objeto.memory_usage(deep=profundo)))
+        elif isinstance(objeto, np.ndarray):
+            total += objeto.nbytes
+        elif isinstance(objeto, dict):
+            total += tamanho_memoria(*objeto.values(), profundo=profundo)
+        elif isinstance(objeto, (list, tuple)):
+            total += tamanho_memoria(*objeto, profundo=profundo)
+        else:
+            total += sys.getsizeof(objeto)
+    return total
+
+
+# Função para devolver a coluna como uma série sem cópia dos dados, com o array
+# NumPy marcado como somente leitura (colunas de objetos e do Arrow ficam como
+# estão)
+def _coluna_somente_leitura(serie):
+    valores = serie.array
+    if isinstance(valores, pd.Categorical):
+        # `codes` já é uma view somente leitura dos códigos
+        valores = pd.Categorical.from_codes(valores.codes, dtype=valores.dtype)
+    elif isinstance(valores, (pd.arrays.NumpyExtensionArray, pd.arrays.DatetimeArray)):
+        if serie.dtype == object:
+            return serie
+        valores = serie.to_numpy(copy=False).view()
+        valores.flags.writeable = False
+    else:
+        return serie
+    return pd.Series(valores, index=serie.index, name=serie.name, copy=False)
+
+
+def somente_leitura(df):
+    """
+    DataFrame com as mesmas colunas de `df`, sem cópia dos dados, com os
+    arrays NumPy (números, datas e códigos das categorias) marcados como
+    somente leitura (`flags.writeable = False`): qualquer alteração no lugar
+    (ex.: `df.loc[...] = ...`) passa a lançar erro. Ficam de fora as colunas
+    de objetos (várias rotinas do pandas, como `memory_usage(deep=True)`, não
+    aceitam arrays de objetos somente leitura) e as do Arrow (o pandas troca o
+    array da coluna em vez de escrever nele).
+    """
+    # O flag vale para cada view separadamente: marcar os arrays de `df` não
+    # protegeria as views que ele já guarda internamente. Por isso o DataFrame
+    # é remontado a partir de views somente leitura, e as colunas lidas depois
+    # (views delas) já nascem somente leitura.
+    return pd.DataFrame(
+        {coluna: _coluna_somente_leitura(df[coluna]) for coluna in df.columns},
+        copy=False,
+    )
+
+
+def resumo_memoria(tamanho_compartilhado, sessao):
+    """
+    Texto com a memória da base compartilhada (`tamanho_compartilhado`, em
+    bytes, medido uma vez com `tamanho_memoria(base, profundo=True)`) e dos
+    objetos da `sessao` (os resultados dos filtros desta sessão), em MB.
+    """
+    return (
+        f"Base compartilhada: {tamanho_compartilhado / MB:,.2f} MB · "
+        f"Esta sessão: {tamanho_memoria(sessao) / MB:,.2f} MB"
+    )
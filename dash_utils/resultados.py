@@ -0,0 +1,203 @@
+"""
+Cache em disco dos resultados agregados dos dashboards.
+
+Os resultados (ex.: vendas por produto, por país, tendência mensal) ficam em um
+banco SQLite ao lado da base, com a chave formada pelo hash do conteúdo da base
+e pela seleção de filtros em forma canônica (listas ordenadas, tipos do NumPy
+convertidos). Assim sobrevivem a reinícios do servidor e são reaproveitados
+por várias réplicas do dashboard no mesmo servidor.
+
+A chave também leva a versão do código: `VERSAO_RESULTADOS`, as versões do
+pandas e do NumPy (os resultados são objetos serializados com `pickle`) e,
+pelos dashboards, `versao_codigo` (hash dos arquivos do cálculo e deste
+pacote). Um deploy que muda uma agregação ou os tipos da base gera chaves
+novas em vez de devolver os resultados antigos.
+
+O SQLite cuida do acesso concorrente de vários processos (modo WAL, com espera
+pelo bloqueio). O tamanho total é limitado: ao passar do limite, saem os
+resultados usados há mais tempo (LRU). A leitura só grava a hora do acesso se
+a anterior tiver mais de `INTERVALO_ACESSO` segundos, para que as leituras
+repetidas não disputem o bloqueio de escrita. Qualquer erro do banco só desliga
+o cache naquela chamada; o resultado é calculado normalmente.
+"""
+
+import contextlib
+import datetime
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+# Versão do formato dos resultados guardados; mudar invalida o cache inteiro
+VERSAO_RESULTADOS = 1
+
+# Intervalo mínimo (em segundos) entre duas marcações de acesso de um resultado
+INTERVALO_ACESSO = 60
+
+_CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    chave TEXT PRIMARY KEY,
+    valor BLOB NOT NULL,
+    tamanho INTEGER NOT NULL,
+    acesso REAL NOT NULL
+)
+"""
+
+# Remove os resultados mais antigos (por último acesso) além do limite de bytes
+_REMOVER_EXCESSO = """
+DELETE FROM resultados WHERE chave IN (
+    SELECT chave FROM (
+        SELECT chave, SUM(tamanho) OVER (ORDER BY acesso DESC, chave) AS acumulado
+        FROM resultados
+    ) WHERE acumulado > ?
+)
+"""
+
+
+# Função para escrever um valor da chave em forma canônica (serializável em JSON).
+# Listas e conjuntos são ordenados (a ordem de seleção dos filtros não importa);
+# tuplas mantêm a ordem (ex.: início e fim de um período).
+def _canonico(valor):
+    if isinstance(valor, dict):
+        return {str(k): _canonico(v) for k, v in valor.items()}
+    if isinstance(valor, tuple):
+        return [_canonico(v) for v in valor]
+    if isinstance(valor, (list, set, frozenset, np.ndarray, pd.Index)):
+        itens = [_canonico(v) for v in valor]
+        return sorted(itens, key=lambda item: json.dumps(item, sort_keys=True))
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, (datetime.date, pd.Timestamp)):
+        return valor.isoformat()
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    return str(valor)
+
+
+def chave_resultado(*partes):
+    """
+    Chave (hash) das `partes` (versão da base e do código, painel, filtros
+    etc.), junto com `VERSAO_RESULTADOS` e as versões do pandas e do NumPy.
+    """
+    versoes = (VERSAO_RESULTADOS, pd.__version__, np.__version__)
+    texto = json.dumps(_canonico((versoes, partes)), sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Função para calcular o hash de um arquivo de código; refeito só quando o
+# arquivo muda (data de modificação ou tamanho)
+@functools.lru_cache(maxsize=64)
+def _hash_codigo(caminho, modificado, tamanho):
+    with open(caminho, "rb") as arquivo:
+        return hashlib.blake2b(arquivo.read(), digest_size=16).hexdigest()
+
+
+def versao_codigo(*objetos):
+    """
+    Hash dos arquivos de código onde os `objetos` (funções, classes ou módulos)
+    foram definidos e dos módulos deste pacote, para a chave dos resultados:
+    muda sempre que o cálculo (ou a leitura da base) muda de código.
+    """
+    pacote = os.path.dirname(os.path.abspath(__file__))
+    caminhos = {
+        os.path.join(pacote, nome)
+        for nome in os.listdir(pacote)
+        if nome.endswith(".py")
+    }
+    # `inspect.unwrap` chega à função original de um decorador (ex.: `st.cache_data`)
+    caminhos.update(
+        os.path.abspath(inspect.getfile(inspect.unwrap(o))) for o in objetos
+    )
+    hashes = []
+    for caminho in sorted(filter(os.path.isfile, caminhos)):
+        info = os.stat(caminho)
+        hashes.append(_hash_codigo(caminho, info.st_mtime_ns, info.st_size))
+    return chave_resultado(hashes)
+
+
+class CacheResultados:
+    """
+    Cache em disco no arquivo SQLite `caminho`, com até `limite_mb` MB de
+    resultados (serializados com `pickle`). Pode ser compartilhado entre
+    sessões e threads: cada operação abre sua própria conexão.
+    """
+
+    def __init__(self, caminho, limite_mb=256):
+        self.caminho = caminho
+        self.limite = int(limite_mb * 1024 * 1024)
+        try:
+            with self._conectar() as conexao:
+                conexao.execute("PRAGMA journal_mode = WAL")
+                conexao.execute(_CRIAR_TABELA)
+                conexao.execute(
+                    "CREATE INDEX IF NOT EXISTS resultados_acesso "
+                    "ON resultados (acesso)"
+                )
+        except sqlite3.Error:
+            self.caminho = None  # Banco inacessível: o cache fica desligado
+
+    # Função para abrir uma conexão que espera (em vez de falhar) quando outro
+    # processo está gravando. A transação é confirmada (ou desfeita, se houver
+    # erro) e a conexão é fechada na saída do bloco `with`
+    @contextlib.contextmanager
+    def _conectar(self):
+        with contextlib.closing(sqlite3.connect(self.caminho, timeout=30)) as conexao:
+            with conexao:
+                yield conexao
+
+    # Função para ler um resultado (None se não houver). A hora do acesso só é
+    # gravada se a anterior for mais antiga que `INTERVALO_ACESSO`: a maioria
+    # das leituras não pega o bloqueio de escrita
+    def _ler(self, chave):
+        with self._conectar() as conexao:
+            linha = conexao.execute(
+                "SELECT valor, acesso FROM resultados WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None:
+                return None
+            agora = time.time()
+            if agora - linha[1] >= INTERVALO_ACESSO:
+                try:
+                    conexao.execute(
+                        "UPDATE resultados SET acesso = ? WHERE chave = ?",
+                        (agora, chave),
+                    )
+                except sqlite3.OperationalError:
+                    pass  # Banco ocupado: o acesso fica para a próxima leitura
+        return linha[0]
+
+    # Função para gravar um resultado e remover os excedentes do limite
+    def _gravar(self, chave, dados):
+        with self._conectar() as conexao:
+            conexao.execute(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)",
+                (chave, dados, len(dados), time.time()),
+            )
+            conexao.execute(_REMOVER_EXCESSO, (self.limite,))
+
+    def obter(self, chave, calcular):
+        """
+        Resultado guardado para a `chave` (de `chave_resultado`); se não houver
+        (ou não puder ser lido), chama `calcular()`, guarda e retorna o valor.
+        """
+        if self.caminho is None:
+            return calcular()
+        try:
+            dados = self._ler(chave)
+            if dados is not None:
+                return pickle.loads(dados)
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError):
+            pass
+        valor = calcular()
+        try:
+            self._gravar(chave, pickle.dumps(valor, pickle.HIGHEST_PROTOCOL))
+        except sqlite3.Error:
+            pass
+        return valor
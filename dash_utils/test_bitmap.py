@@ -0,0 +1,43 @@
+"""
+Testes do índice de bitmaps (`bitmap.py`).
+
+Rodam com `python -m pytest dash_utils`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dash_utils.bitmap import IndiceBitmap
+
+DADOS = pd.DataFrame(
+    {
+        "letra": ["a", "b", "c", "d", None] * 2,
+        "numero": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    }
+)
+
+
+def _esperado(selecao):
+    mascara = np.ones(len(DADOS), dtype=bool)
+    for coluna, aceitos in selecao.items():
+        mascara &= DADOS[coluna].isin(aceitos).to_numpy()
+    return mascara
+
+
+def test_selecao_igual_a_isin_com_valores_ausentes():
+    indice = IndiceBitmap(DADOS, ["letra", "numero"])
+    selecoes = [
+        {"letra": ["a"]},  # OU dos selecionados
+        {"letra": ["a", "b", "c"]},  # inversão dos não selecionados
+        {"letra": ["a", "b", "c", "d"]},  # todos os valores
+        {"letra": ["a", "b", "c"], "numero": [1, 2, 3, 6, 7, 8, 9]},
+    ]
+    for selecao in selecoes:
+        esperado = _esperado(selecao)
+        assert (indice.mascara(selecao) == esperado).all(), selecao
+        assert indice.contar(selecao) == esperado.sum(), selecao
+
+
+def test_coluna_sem_valores_ausentes_com_todos_selecionados_nao_filtra():
+    indice = IndiceBitmap(DADOS, ["numero"])
+    assert indice.selecionar({"numero": list(range(1, 11))}) is None
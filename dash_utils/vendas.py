@@ -0,0 +1,663 @@
+"""
+Carregamento da base de vendas de eletrônicos (`vendas_eletronicos.csv`).
+
+Na primeira leitura o CSV é convertido para um arquivo Parquet "sidecar"
+(`<arquivo>.cache.parquet`, ao lado do CSV) já com os tipos compactos: data
+como datetime, textos repetitivos como categorias, nomes e e-mails como
+strings do Arrow, o `ID_Cliente` (UUID) como 16 bytes e inteiros pequenos. As
+leituras seguintes usam o Parquet, que é muito mais rápido de carregar que o
+CSV.
+
+O sidecar guarda o tamanho, a data de modificação e o hash do CSV de origem;
+se o CSV mudar, o sidecar é recriado. O último hash calculado do CSV fica em
+`<arquivo>.origem.json`: um CSV copiado (mesmo conteúdo, outra data de
+modificação) tem o hash conferido uma única vez, e não a cada carga.
+
+A base também pode ser gravada particionada por ano e mês
+(`<arquivo>.particoes/<versão>/Ano=AAAA/Mes=MM/parte.parquet`), para ler só os
+períodos selecionados (o backend DuckDB lê só as pastas dos meses filtrados),
+e já pré-processada em um arquivo Arrow IPC (`<arquivo>.arrow`), mapeado em
+memória pelos processos que a usam.
+
+Para gerar todos esses arquivos de uma vez (ex.: antes de subir várias réplicas
+do dashboard), rode na raiz do repositório:
+
+    python -m dash_utils.vendas vendas_eletronicos.csv
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos ao criar as partições
+    fcntl = None
+
+# Tipos de cada coluna do CSV de vendas (textos únicos por cliente como
+# strings do Arrow, sem um objeto Python por linha)
+TIPOS_VENDAS = {
+    "ID_Venda": "int64",
+    "ID_Cliente": "string[pyarrow]",
+    "Nome_Cliente": "string[pyarrow]",
+    "Email_Cliente": "string[pyarrow]",
+    "País": "category",
+    "Categoria_Produto": "category",
+    "Produto": "category",
+    "Preço_Unitário": "float64",
+    "Quantidade": "int8",
+    "Total_Venda": "float64",
+}
+COLUNAS_DATA = ["Data_Venda"]
+
+# Colunas criadas por `preprocessar_vendas` a partir de `Data_Venda`
+COLUNAS_DERIVADAS = ["Ano", "Mês", "Trimestre", "Hora"]
+
+# UUIDs guardados como 16 bytes (em vez de um texto de 36 caracteres)
+TIPO_UUID = pd.ArrowDtype(pa.binary(16))
+COLUNAS_UUID = ["ID_Cliente"]
+
+# Tipos do pandas para os tipos do Arrow ao ler os arquivos Parquet
+_TIPOS_PANDAS = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow"),
+    pa.binary(16): TIPO_UUID,
+}
+
+# Chave dos metadados do Parquet onde fica a identificação do CSV de origem
+_CHAVE_ORIGEM = b"vendas_origem"
+
+# Versão do formato dos derivados (sidecar e partições): muda quando os tipos
+# gravados mudam, para que arquivos antigos sejam recriados
+_FORMATO = 2
+
+
+def caminho_sidecar(caminho_csv):
+    return f"{caminho_csv}.cache.parquet"
+
+
+def caminho_origem(caminho_csv):
+    return f"{caminho_csv}.origem.json"
+
+
+# Função para calcular o hash do conteúdo de um arquivo, em blocos
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(caminho, "rb") as arquivo:
+        while bloco := arquivo.read(tamanho_bloco):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+# Função para identificar a versão do CSV (tamanho e data de modificação)
+def _assinatura(caminho_csv):
+    estado = os.stat(caminho_csv)
+    return {"tamanho": estado.st_size, "mtime_ns": estado.st_mtime_ns}
+
+
+def versao_arquivo(caminho_csv):
+    """
+    Identificador barato da versão do CSV (tamanho e data de modificação), para
+    usar como chave de cache: muda sempre que o arquivo é regravado.
+    """
+    assinatura = _assinatura(caminho_csv)
+    return (assinatura["tamanho"], assinatura["mtime_ns"])
+
+
+# Função para obter o hash do CSV com a `assinatura` atual. O último hash
+# calculado fica gravado com a assinatura em `<arquivo>.origem.json` e é
+# reaproveitado enquanto o CSV não mudar (mesmo tamanho e data de modificação)
+def _hash_csv(caminho_csv, assinatura):
+    caminho = caminho_origem(caminho_csv)
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            gravado = json.load(arquivo)
+        if all(gravado[chave] == valor for chave, valor in assinatura.items()):
+            return gravado["hash"]
+    except (OSError, ValueError, KeyError):
+        pass
+    digest = hash_arquivo(caminho_csv)
+    try:
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump({**assinatura, "hash": digest}, arquivo)
+        os.replace(temporario, caminho)
+    except OSError:
+        pass  # Pasta sem permissão de escrita: o hash é recalculado na próxima vez
+    return digest
+
+
+# Função para identificar o CSV (assinatura e hash), gravada junto dos derivados
+def _origem(caminho_csv):
+    assinatura = _assinatura(caminho_csv)
+    return {
+        **assinatura,
+        "hash": _hash_csv(caminho_csv, assinatura),
+        "formato": _FORMATO,
+    }
+
+
+# Função para verificar se um derivado foi gerado a partir do CSV atual
+def _origem_confere(caminho_csv, origem):
+    atual = _assinatura(caminho_csv)
+    if origem.get("formato") != _FORMATO:
+        return False
+    if atual["tamanho"] != origem["tamanho"]:
+        return False
+    if atual["mtime_ns"] == origem["mtime_ns"]:
+        return True
+    # Mesmo tamanho mas data diferente (ex.: arquivo copiado): confere o hash,
+    # que fica gravado com a nova data para as próximas cargas
+    return _hash_csv(caminho_csv, atual) == origem["hash"]
+
+
+# Função para verificar se o sidecar corresponde ao CSV atual
+def sidecar_valido(caminho_csv, caminho_parquet):
+    if not os.path.exists(caminho_parquet):
+        return False
+    metadados = pq.read_schema(caminho_parquet).metadata or {}
+    if _CHAVE_ORIGEM not in metadados:
+        return False
+    return _origem_confere(caminho_csv, json.loads(metadados[_CHAVE_ORIGEM]))
+
+
+# Tabela de conversão de um caractere hexadecimal (byte ASCII) no seu valor
+_HEXA = np.full(256, 255, dtype=np.uint8)
+_HEXA[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+_HEXA[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+_HEXA[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+
+
+def uuid_para_bytes(serie):
+    """
+    Converte uma série de UUIDs em texto ("xxxxxxxx-xxxx-...") para 16 bytes
+    por valor (`TIPO_UUID`), de forma vetorizada. Se algum valor não for um
+    UUID válido (ou for nulo), a série volta como texto, sem conversão.
+    """
+    textos = pa.array(serie.astype("string[pyarrow]"))
+    if isinstance(textos, pa.ChunkedArray):
+        textos = textos.combine_chunks()
+    hexa = pc.replace_substring(textos, "-", "")
+    tamanhos = pc.utf8_length(hexa)
+    if hexa.null_count or not pc.all(pc.equal(tamanhos, 32), min_count=0).as_py():
+        return serie
+    # Todos os textos têm 32 caracteres: o buffer de dados é uma matriz n x 32
+    inicio = np.frombuffer(hexa.buffers()[1], dtype=np.int32)[hexa.offset]
+    caracteres = np.frombuffer(hexa.buffers()[2], dtype=np.uint8)
+    caracteres = caracteres[inicio : inicio + 32 * len(hexa)]
+    nibbles = _HEXA[caracteres].reshape(-1, 32)
+    if (nibbles == 255).any():
+        return serie
+    valores = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+    binario = pa.FixedSizeBinaryArray.from_buffers(
+        pa.binary(16), len(valores), [None, pa.py_buffer(valores.tobytes())]
+    )
+    return pd.Series(
+        pd.arrays.ArrowExtensionArray(binario), index=serie.index, name=serie.name
+    )
+
+
+def uuid_texto(valores):
+    """
+    Converte UUIDs em 16 bytes de volta para texto ("xxxxxxxx-xxxx-...");
+    valores que já são texto ficam como estão. Retorna uma série de strings.
+    """
+    valores = pd.Series(valores)
+    if valores.dtype == TIPO_UUID:
+        valores = valores.map(lambda v: str(uuid.UUID(bytes=v)), na_action="ignore")
+    return valores.astype(str)
+
+
+def para_exibicao(df):
+    """Cópia de `df` com as colunas de UUID em texto, para mostrar na tela."""
+    uuids = [coluna for coluna in COLUNAS_UUID if coluna in df.columns]
+    return df.assign(**{coluna: uuid_texto(df[coluna]) for coluna in uuids})
+
+
+def compactar_vendas(df):
+    """
+    Converte as colunas de UUID (`COLUNAS_UUID`) da base para 16 bytes por
+    valor; as demais já vêm compactas de `TIPOS_VENDAS`. Altera `df`.
+    """
+    for coluna in COLUNAS_UUID:
+        df[coluna] = uuid_para_bytes(df[coluna])
+    return df
+
+
+# Função para converter uma tabela do Arrow em DataFrame com os tipos compactos
+# (os metadados do pandas não sabem recriar os UUIDs em 16 bytes). Cada coluna
+# fica em um bloco próprio: juntar as colunas do mesmo tipo copiaria os dados.
+def _para_pandas(tabela):
+    return tabela.to_pandas(
+        types_mapper=_TIPOS_PANDAS.get, ignore_metadata=True, split_blocks=True
+    )
+
+
+# Função para ler o CSV de vendas já com os tipos de `TIPOS_VENDAS`
+def ler_csv_vendas(caminho_csv):
+    df = pd.read_csv(caminho_csv, engine="pyarrow", dtype=TIPOS_VENDAS)
+    for coluna in COLUNAS_DATA:
+        df[coluna] = pd.to_datetime(df[coluna]).astype("datetime64[ns]")
+    return compactar_vendas(df)
+
+
+# Função para gravar o sidecar Parquet do CSV
+def criar_sidecar(caminho_csv, caminho_parquet):
+    # A assinatura é lida antes do CSV: se ele mudar durante a leitura, o
+    # sidecar nasce inválido e é recriado na próxima carga
+    origem = _origem(caminho_csv)
+    df = ler_csv_vendas(caminho_csv)
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    tabela = tabela.replace_schema_metadata(
+        {**(tabela.schema.metadata or {}), _CHAVE_ORIGEM: json.dumps(origem)}
+    )
+    # Grava em um arquivo temporário e renomeia, para que outro processo nunca
+    # leia um sidecar pela metade
+    temporario = f"{caminho_parquet}.{os.getpid()}.tmp"
+    pq.write_table(tabela, temporario)
+    os.replace(temporario, caminho_parquet)
+    return df
+
+
+def carregar_vendas(caminho_csv="vendas_eletronicos.csv"):
+    """
+    Carrega a base de vendas, usando o sidecar Parquet quando ele estiver
+    atualizado e recriando-o a partir do CSV caso contrário.
+    Lança `FileNotFoundError` se o CSV não existir.
+    """
+    caminho_parquet = caminho_sidecar(caminho_csv)
+    if sidecar_valido(caminho_csv, caminho_parquet):
+        return _para_pandas(pq.read_table(caminho_parquet))
+    return criar_sidecar(caminho_csv, caminho_parquet)
+
+
+class BaseVendas:
+    """
+    Base de vendas lida do sidecar Parquet coluna a coluna, só no que é usado.
+    As `colunas` informadas são lidas na criação; as demais, no primeiro acesso
+    (`base["Nome_Cliente"]` ou `base.quadro([...])`), e ficam em memória para
+    os acessos seguintes. O arquivo fica aberto, então as colunas lidas depois
+    vêm da mesma versão da base mesmo que o sidecar seja recriado; `origem`
+    identifica essa versão do CSV (tamanho, data e hash do conteúdo). Pode ser
+    compartilhada entre sessões (`st.cache_resource`).
+    Lança `FileNotFoundError` se o CSV não existir.
+    """
+
+    def __init__(self, caminho_csv="vendas_eletronicos.csv", colunas=()):
+        caminho_parquet = caminho_sidecar(caminho_csv)
+        if not sidecar_valido(caminho_csv, caminho_parquet):
+            criar_sidecar(caminho_csv, caminho_parquet)
+        self._arquivo = pq.ParquetFile(caminho_parquet)
+        self.origem = json.loads(self._arquivo.schema_arrow.metadata[_CHAVE_ORIGEM])
+        self.colunas = self._arquivo.schema_arrow.names
+        self.num_linhas = self._arquivo.metadata.num_rows
+        self._dados = {}
+        self._trava = threading.Lock()
+        self.carregar(colunas)
+
+    @property
+    def carregadas(self):
+        """Colunas já lidas do arquivo, na ordem da base."""
+        return [coluna for coluna in self.colunas if coluna in self._dados]
+
+    def carregar(self, colunas):
+        """Lê do arquivo, de uma vez, as `colunas` que ainda não foram lidas."""
+        with self._trava:
+            faltando = [coluna for coluna in colunas if coluna not in self._dados]
+            if faltando:
+                lidas = _para_pandas(self._arquivo.read(columns=faltando))
+                self._dados.update(lidas.items())
+
+    def __getitem__(self, coluna):
+        self.carregar([coluna])
+        return self._dados[coluna]
+
+    def quadro(self, colunas):
+        """
+        DataFrame com as `colunas`, na ordem pedida (lidas se preciso). As
+        colunas não são copiadas: o DataFrame usa os mesmos arrays da base e
+        deve ser tratado como somente leitura.
+        """
+        self.carregar(colunas)
+        return pd.concat(
+            {coluna: self._dados[coluna] for coluna in colunas}, axis=1, copy=False
+        )
+
+    def amostra(self, n=5):
+        """As primeiras `n` linhas, com todas as colunas (lê só o início do arquivo)."""
+        with self._trava:
+            lote = next(self._arquivo.iter_batches(batch_size=n), None)
+        if lote is None:
+            return _para_pandas(self._arquivo.schema_arrow.empty_table())
+        return _para_pandas(pa.Table.from_batches([lote]))
+
+    def resumo_colunas(self):
+        """
+        `Coluna`, `Não Nulos` e `Tipo` (no pandas) de todas as colunas, tirados
+        dos metadados do arquivo, sem ler os dados.
+        """
+        metadados = self._arquivo.metadata
+        nulos = dict.fromkeys(self.colunas, 0)
+        for g in range(metadados.num_row_groups):
+            grupo = metadados.row_group(g)
+            for i in range(grupo.num_columns):
+                coluna = grupo.column(i)
+                estatisticas = coluna.statistics
+                if estatisticas is None or not estatisticas.has_null_count:
+                    nulos[coluna.path_in_schema] = None
+                elif nulos[coluna.path_in_schema] is not None:
+                    nulos[coluna.path_in_schema] += estatisticas.null_count
+        # Sem estatísticas no arquivo, conta os nulos na própria coluna
+        for coluna, quantidade in nulos.items():
+            if quantidade is None:
+                nulos[coluna] = int(self[coluna].isna().sum())
+        tipos = _para_pandas(self._arquivo.schema_arrow.empty_table()).dtypes
+        return pd.DataFrame(
+            {
+                "Coluna": self.colunas,
+                "Não Nulos": [self.num_linhas - nulos[c] for c in self.colunas],
+                "Tipo": tipos.astype(str).to_numpy(),
+            }
+        )
+
+
+def preprocessar_vendas(df):
+    """
+    Retorna a base com `Data_Venda` como datetime e as colunas derivadas
+    `Ano` (int16), `Mês`, `Trimestre` e `Hora` (int8). O DataFrame recebido não
+    é alterado; suas colunas são reaproveitadas sem cópia no resultado.
+    """
+    datas = df["Data_Venda"]
+    if not pd.api.types.is_datetime64_any_dtype(datas):
+        datas = pd.to_datetime(datas)
+    colunas = {coluna: df[coluna] for coluna in df.columns}
+    colunas.update(
+        Data_Venda=datas,
+        Ano=datas.dt.year.astype("int16"),
+        Mês=datas.dt.month.astype("int8"),
+        Trimestre=datas.dt.quarter.astype("int8"),
+        Hora=datas.dt.hour.astype("int8"),
+    )
+    return pd.concat(colunas, axis=1, copy=False)
+
+
+# Função para estimar a memória de uma coluna lida com os tipos padrão do
+# `pd.read_csv` (textos como objetos Python e números de 64 bits)
+def _memoria_padrao(serie):
+    ponteiros = 8 * len(serie)
+    if serie.dtype == TIPO_UUID:
+        return ponteiros + len(serie) * sys.getsizeof("0" * 36)
+    if isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(
+        serie.dtype
+    ):
+        contagens = serie.value_counts(dropna=False)
+        tamanhos = [sys.getsizeof(str(valor)) for valor in contagens.index]
+        return ponteiros + int(np.dot(tamanhos, contagens.to_numpy()))
+    return ponteiros
+
+
+def relatorio_memoria(df):
+    """
+    Memória de cada coluna da base: `Coluna`, `Tipo`, `Padrão (MB)` (estimada
+    com os tipos padrão do `pd.read_csv`) e `Compacto (MB)` (com os tipos
+    atuais), com uma linha final de `Total`.
+    """
+    mb = 1024 * 1024
+    relatorio = pd.DataFrame(
+        {
+            "Coluna": df.columns,
+            "Tipo": df.dtypes.astype(str).to_numpy(),
+            "Padrão (MB)": [_memoria_padrao(df[c]) / mb for c in df.columns],
+            "Compacto (MB)": df.memory_usage(deep=True, index=False).to_numpy() / mb,
+        }
+    )
+    total = pd.DataFrame(
+        {
+            "Coluna": ["Total"],
+            "Tipo": [""],
+            "Padrão (MB)": [relatorio["Padrão (MB)"].sum()],
+            "Compacto (MB)": [relatorio["Compacto (MB)"].sum()],
+        }
+    )
+    return pd.concat([relatorio, total], ignore_index=True).round(2)
+
+
+# --- ARMAZENAMENTO PARTICIONADO POR ANO E MÊS ---
+
+# Cada criação das partições vai para uma pasta de versão própria
+# (`<arquivo>.particoes/v-<id>`); o arquivo `ATUAL` aponta a versão em uso e é
+# trocado de uma só vez (`os.replace`). Quem lê sempre encontra uma versão
+# completa, e a anterior fica no disco até a próxima criação, para quem já a
+# estava lendo. Processos que criam as partições ao mesmo tempo se revezam pela
+# trava `.trava`.
+_ARQUIVO_ATUAL = "ATUAL"
+_ARQUIVO_TRAVA = ".trava"
+
+# Arquivo com a origem de cada versão (além das pastas `Ano=AAAA/Mes=MM`)
+_ARQUIVO_ORIGEM = "_origem.json"
+
+
+# Pasta que guarda as versões das partições de um CSV
+def _base_particoes(caminho_csv):
+    return f"{caminho_csv}.particoes"
+
+
+def caminho_particoes(caminho_csv):
+    """Pasta da versão atual das partições; None se ainda não foram criadas."""
+    base = _base_particoes(caminho_csv)
+    try:
+        with open(os.path.join(base, _ARQUIVO_ATUAL), encoding="utf-8") as arquivo:
+            versao = arquivo.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(base, versao)
+
+
+# Função para verificar se as partições correspondem ao CSV atual
+def particoes_validas(caminho_csv, diretorio):
+    if diretorio is None:
+        return False
+    arquivo_origem = os.path.join(diretorio, _ARQUIVO_ORIGEM)
+    if not os.path.exists(arquivo_origem):
+        return False
+    with open(arquivo_origem, encoding="utf-8") as arquivo:
+        return _origem_confere(caminho_csv, json.load(arquivo))
+
+
+# Trava exclusiva entre processos enquanto as partições são criadas
+@contextlib.contextmanager
+def _travar_particoes(caminho_csv):
+    base = _base_particoes(caminho_csv)
+    os.makedirs(base, exist_ok=True)
+    with open(os.path.join(base, _ARQUIVO_TRAVA), "a+b") as trava:
+        if fcntl is not None:
+            fcntl.flock(trava, fcntl.LOCK_EX)
+        yield  # A trava é liberada ao fechar o arquivo
+
+
+# Função para gravar a base particionada por ano e mês em uma nova versão, que
+# passa a ser a atual (chamar com a trava)
+def criar_particoes(caminho_csv):
+    origem = _origem(caminho_csv)
+    df = carregar_vendas(caminho_csv)
+    datas = df["Data_Venda"]
+    anos, meses = datas.dt.year.rename("Ano"), datas.dt.month.rename("Mês")
+
+    base = _base_particoes(caminho_csv)
+    versao = f"v-{uuid.uuid4().hex}"
+    diretorio = os.path.join(base, versao)
+    os.makedirs(diretorio)
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    for (ano, mes), linhas in df.groupby([anos, meses]).indices.items():
+        pasta = os.path.join(diretorio, f"Ano={ano}", f"Mes={mes:02d}")
+        os.makedirs(pasta)
+        pq.write_table(tabela.take(linhas), os.path.join(pasta, "parte.parquet"))
+
+    caminho_origem = os.path.join(diretorio, _ARQUIVO_ORIGEM)
+    with open(caminho_origem, "w", encoding="utf-8") as arquivo:
+        json.dump(origem, arquivo)
+
+    # Aponta a nova versão de uma só vez
+    anterior = caminho_particoes(caminho_csv)
+    atual = os.path.join(base, _ARQUIVO_ATUAL)
+    temporario = f"{atual}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(versao)
+    os.replace(temporario, atual)
+
+    # Remove as versões mais antigas que a anterior (e arquivos de formatos
+    # antigos), mantendo a atual e a anterior
+    manter = {_ARQUIVO_ATUAL, _ARQUIVO_TRAVA, versao}
+    if anterior is not None:
+        manter.add(os.path.basename(anterior))
+    for nome in os.listdir(base):
+        if nome in manter:
+            continue
+        caminho = os.path.join(base, nome)
+        if os.path.isdir(caminho):
+            shutil.rmtree(caminho, ignore_errors=True)
+        else:
+            with contextlib.suppress(OSError):
+                os.remove(caminho)
+    return diretorio
+
+
+# Função para garantir que as partições existem e estão atualizadas
+def _preparar_particoes(caminho_csv):
+    diretorio = caminho_particoes(caminho_csv)
+    if particoes_validas(caminho_csv, diretorio):
+        return diretorio
+    with _travar_particoes(caminho_csv):
+        # Outro processo pode ter criado as partições enquanto esperávamos
+        diretorio = caminho_particoes(caminho_csv)
+        if not particoes_validas(caminho_csv, diretorio):
+            diretorio = criar_particoes(caminho_csv)
+    return diretorio
+
+
+def listar_particoes(diretorio):
+    """
+    Lista os arquivos das partições `(ano, mês, caminho)` de uma versão
+    (`caminho_particoes`), sem abrir os arquivos.
+    """
+    particoes = []
+    for pasta_ano in sorted(os.listdir(diretorio)):
+        if not pasta_ano.startswith("Ano="):
+            continue
+        ano = int(pasta_ano.removeprefix("Ano="))
+        for pasta_mes in sorted(os.listdir(os.path.join(diretorio, pasta_ano))):
+            mes = int(pasta_mes.removeprefix("Mes="))
+            caminho = os.path.join(diretorio, pasta_ano, pasta_mes, "parte.parquet")
+            particoes.append((ano, mes, caminho))
+    return particoes
+
+
+# --- BASE PRÉ-PROCESSADA EM ARROW IPC, MAPEADA EM MEMÓRIA ---
+
+
+def caminho_arrow(caminho_csv):
+    return f"{caminho_csv}.arrow"
+
+
+# Função para verificar se o arquivo Arrow corresponde ao CSV atual
+def arrow_valido(caminho_csv, caminho):
+    if not os.path.exists(caminho):
+        return False
+    with pa.memory_map(caminho) as arquivo:
+        metadados = pa.ipc.open_file(arquivo).schema.metadata or {}
+    if _CHAVE_ORIGEM not in metadados:
+        return False
+    return _origem_confere(caminho_csv, json.loads(metadados[_CHAVE_ORIGEM]))
+
+
+# Função para gravar a base pré-processada (com as colunas derivadas) em um
+# arquivo Arrow IPC sem compressão, que pode ser mapeado em memória sem cópia
+def criar_arquivo_arrow(caminho_csv, caminho):
+    origem = _origem(caminho_csv)
+    df = preprocessar_vendas(carregar_vendas(caminho_csv))
+    tabela = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    tabela = tabela.replace_schema_metadata(
+        {**(tabela.schema.metadata or {}), _CHAVE_ORIGEM: json.dumps(origem)}
+    )
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with pa.OSFile(temporario, "wb") as arquivo:
+        with pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    os.replace(temporario, caminho)
+
+
+# Função para garantir que o arquivo Arrow existe e está atualizado
+def _preparar_arrow(caminho_csv):
+    caminho = caminho_arrow(caminho_csv)
+    if not arrow_valido(caminho_csv, caminho):
+        criar_arquivo_arrow(caminho_csv, caminho)
+    return caminho
+
+
+class BaseVendasMapeada:
+    """
+    Base de vendas pré-processada (com `Ano`, `Mês`, `Trimestre` e `Hora`) lida
+    do arquivo Arrow IPC mapeado em memória, com a mesma leitura de
+    `BaseVendas` (`base["coluna"]`, `base.quadro([...])`). As colunas viram
+    DataFrames sem cópia, apontando para as páginas do arquivo: vários
+    processos no mesmo servidor usam uma única cópia física da base (o cache de
+    páginas do sistema operacional) e só as páginas das colunas usadas são
+    lidas do disco. Os dados são somente leitura; `origem` identifica a versão
+    do CSV de onde vieram, como em `BaseVendas`.
+
+    O arquivo é criado (ou recriado, se o CSV mudou) na primeira abertura; o
+    passo de construção deste módulo o deixa pronto antes de subir os
+    processos. Lança `FileNotFoundError` se o CSV não existir.
+    """
+
+    def __init__(self, caminho_csv="vendas_eletronicos.csv"):
+        arquivo = pa.memory_map(_preparar_arrow(caminho_csv))
+        self._tabela = pa.ipc.open_file(arquivo).read_all()
+        self.origem = json.loads(self._tabela.schema.metadata[_CHAVE_ORIGEM])
+        self.colunas = self._tabela.column_names
+        self.num_linhas = self._tabela.num_rows
+
+    def __getitem__(self, coluna):
+        return self.quadro([coluna])[coluna]
+
+    def quadro(self, colunas):
+        """DataFrame com as `colunas`, na ordem pedida, sem copiar os dados."""
+        return _para_pandas(self._tabela.select(colunas))
+
+
+def construir_derivados(caminho_csv="vendas_eletronicos.csv"):
+    """
+    Cria (ou recria, se estiverem desatualizados) todos os arquivos derivados
+    do CSV: o sidecar Parquet, as partições por ano/mês e o arquivo Arrow.
+    """
+    caminho_parquet = caminho_sidecar(caminho_csv)
+    if not sidecar_valido(caminho_csv, caminho_parquet):
+        criar_sidecar(caminho_csv, caminho_parquet)
+    _preparar_particoes(caminho_csv)
+    _preparar_arrow(caminho_csv)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Gera os arquivos derivados da base de vendas."
+    )
+    parser.add_argument(
+        "csv", nargs="?", default="vendas_eletronicos.csv", help="CSV de vendas"
+    )
+    opcoes = parser.parse_args()
+    construir_derivados(opcoes.csv)
+    print(f"Arquivos derivados de '{opcoes.csv}' prontos.")
@@ -0,0 +1,196 @@
+"""
+Backend SQL (DuckDB) para as análises da base de vendas.
+
+Em vez de carregar a base inteira em um DataFrame, cada filtro e agregação vira
+uma consulta a um banco DuckDB embutido no processo, lida direto do CSV (ou das
+partições Parquet por ano/mês, se estiverem atualizadas). Só os resultados,
+que são pequenos, vêm para o pandas. O DuckDB lê os arquivos em blocos, usa
+todos os núcleos e grava em disco o que não couber na memória, então a base
+pode ser maior que a RAM.
+
+O DuckDB é opcional (`pip install duckdb`): só é importado quando o backend é
+usado. Os dashboards escolhem o backend pela variável de ambiente
+`VENDAS_BACKEND`: "pandas" (o padrão), "arrow" (pandas sobre a base Arrow
+mapeada em memória, de `dash_utils.vendas`) ou "duckdb".
+"""
+
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dash_utils.vendas import (
+    COLUNAS_UUID,
+    TIPOS_VENDAS,
+    caminho_particoes,
+    listar_particoes,
+    particoes_validas,
+)
+
+# Tipos do DuckDB para cada tipo do pandas em `TIPOS_VENDAS`
+_TIPOS_SQL = {
+    "int64": "BIGINT",
+    "int8": "SMALLINT",
+    "float64": "DOUBLE",
+    "string": "VARCHAR",
+    "string[pyarrow]": "VARCHAR",
+    "category": "VARCHAR",
+}
+
+
+def backend_vendas():
+    """Backend escolhido em `VENDAS_BACKEND` ("pandas" se não definido)."""
+    return os.environ.get("VENDAS_BACKEND", "pandas").strip().lower()
+
+
+# Função para escrever um caminho como texto SQL
+def _texto_sql(texto):
+    return "'" + str(texto).replace("'", "''") + "'"
+
+
+class ConsultasVendas:
+    """
+    Consultas à base de vendas `caminho_csv` pelo DuckDB. A conexão pode ser
+    compartilhada entre sessões (`st.cache_resource`): cada consulta usa um
+    cursor próprio. `limite_memoria` (ex.: "4GB") e `threads` ajustam o DuckDB.
+    Lança `FileNotFoundError` se o CSV não existir e `ImportError` se o DuckDB
+    não estiver instalado.
+    """
+
+    def __init__(
+        self, caminho_csv="vendas_eletronicos.csv", limite_memoria=None, threads=None
+    ):
+        try:
+            import duckdb
+        except ImportError as erro:
+            raise ImportError(
+                "O backend SQL precisa do pacote duckdb (pip install duckdb)."
+            ) from erro
+        if not os.path.exists(caminho_csv):
+            raise FileNotFoundError(caminho_csv)
+
+        self.conexao = duckdb.connect()
+        if limite_memoria:
+            self.conexao.execute(f"SET memory_limit = {_texto_sql(limite_memoria)}")
+        if threads:
+            self.conexao.execute(f"SET threads = {int(threads)}")
+
+        tipos = {coluna: _TIPOS_SQL[tipo] for coluna, tipo in TIPOS_VENDAS.items()}
+        tipos["Data_Venda"] = "TIMESTAMP"
+        tipos_sql = ", ".join(
+            f"{_texto_sql(c)}: {_texto_sql(t)}" for c, t in tipos.items()
+        )
+        self.conexao.execute(
+            "CREATE VIEW origem AS SELECT * FROM "
+            f"read_csv({_texto_sql(caminho_csv)}, header = true, types = {{{tipos_sql}}})"
+        )
+
+        # Com as partições por ano/mês atualizadas, filtros de ano e trimestre
+        # leem só as pastas dos meses selecionados
+        diretorio = caminho_particoes(caminho_csv)
+        if particoes_validas(caminho_csv, diretorio):
+            arquivos = os.path.join(diretorio, "*", "*", "parte.parquet")
+            base = (
+                f"SELECT * FROM read_parquet({_texto_sql(arquivos)}, "
+                "hive_partitioning = true, "
+                "hive_types = {'Ano': 'BIGINT', 'Mes': 'BIGINT'})"
+            )
+            # Os UUIDs gravados em 16 bytes voltam a ser texto, como no CSV
+            particoes = listar_particoes(diretorio)
+            esquema = pq.read_schema(particoes[0][2]) if particoes else None
+            uuids = [
+                f'CAST(CAST("{coluna}" AS UUID) AS VARCHAR) AS "{coluna}"'
+                for coluna in COLUNAS_UUID
+                if esquema is not None and esquema.field(coluna).type == pa.binary(16)
+            ]
+            if uuids:
+                base = f"SELECT * REPLACE ({', '.join(uuids)}) FROM ({base})"
+        else:
+            base = (
+                "SELECT *, year(Data_Venda) AS Ano, month(Data_Venda) AS Mes "
+                "FROM origem"
+            )
+        self.conexao.execute(
+            'CREATE VIEW vendas AS SELECT * EXCLUDE (Mes), Mes AS "Mês", '
+            "(Mes + 2) // 3 AS Trimestre, hour(Data_Venda) AS Hora "
+            f"FROM ({base})"
+        )
+
+    # Função para rodar uma consulta e trazer o resultado como DataFrame
+    def _consultar(self, sql, parametros=None):
+        return self.conexao.cursor().execute(sql, parametros or []).df()
+
+    # Função para montar o WHERE de uma seleção (coluna -> valores aceitos)
+    def _onde(self, selecao):
+        condicoes, parametros = [], []
+        for coluna, valores in (selecao or {}).items():
+            valores = [v.item() if hasattr(v, "item") else v for v in valores]
+            if not valores:
+                condicoes.append("FALSE")
+                continue
+            marcadores = ", ".join("?" * len(valores))
+            condicoes.append(f'"{coluna}" IN ({marcadores})')
+            parametros.extend(valores)
+        onde = " AND ".join(condicoes) or "TRUE"
+        return onde, parametros
+
+    def opcoes(self, coluna):
+        """Valores distintos da coluna, em ordem crescente."""
+        sql = f'SELECT DISTINCT "{coluna}" FROM vendas ORDER BY 1'
+        return self._consultar(sql)[coluna].tolist()
+
+    def totais(self, selecao=None):
+        """
+        Totais da seleção: `Total_Venda`, `Quantidade`, `Vendas` (linhas) e
+        `Clientes` (clientes distintos), como um dicionário.
+        """
+        onde, parametros = self._onde(selecao)
+        sql = (
+            "SELECT coalesce(sum(Total_Venda), 0) AS Total_Venda, "
+            "coalesce(sum(Quantidade), 0)::BIGINT AS Quantidade, count(*) AS Vendas, "
+            "count(DISTINCT ID_Cliente) AS Clientes "
+            f"FROM vendas WHERE {onde}"
+        )
+        return self._consultar(sql, parametros).to_dict("records")[0]
+
+    def agregar(self, por, selecao=None):
+        """
+        `Total_Venda`, `Quantidade` e `Vendas` somados por `por` (lista de
+        colunas) na seleção, ordenados por `por`.
+        """
+        colunas = ", ".join(f'"{coluna}"' for coluna in por)
+        onde, parametros = self._onde(selecao)
+        sql = (
+            f"SELECT {colunas}, sum(Total_Venda) AS Total_Venda, "
+            "sum(Quantidade)::BIGINT AS Quantidade, count(*) AS Vendas "
+            f"FROM vendas WHERE {onde} GROUP BY ALL ORDER BY {colunas}"
+        )
+        return self._consultar(sql, parametros)
+
+    def top_clientes(self, selecao=None, n=5):
+        """
+        Os `n` clientes (por `ID_Cliente`) com maior `Total_Venda` na seleção,
+        com o nome da primeira venda de cada um.
+        """
+        onde, parametros = self._onde(selecao)
+        sql = (
+            "SELECT ID_Cliente, arg_min(Nome_Cliente, ID_Venda) AS Nome_Cliente, "
+            "sum(Total_Venda) AS Total_Venda "
+            f"FROM vendas WHERE {onde} GROUP BY ID_Cliente "
+            f"ORDER BY Total_Venda DESC, ID_Cliente LIMIT {int(n)}"
+        )
+        return self._consultar(sql, parametros)
+
+    def num_linhas(self):
+        return int(self._consultar("SELECT count(*) AS n FROM origem")["n"].iloc[0])
+
+    def amostra(self, n=5):
+        """As primeiras `n` linhas da base, com as colunas do CSV."""
+        return self._consultar(f"SELECT * FROM origem LIMIT {int(n)}")
+
+    def esquema(self):
+        """Colunas da base (`Coluna`) e seus tipos no DuckDB (`Tipo`)."""
+        esquema = self._consultar("DESCRIBE origem")
+        return esquema.rename(columns={"column_name": "Coluna", "column_type": "Tipo"})[
+            ["Coluna", "Tipo"]
+        ]
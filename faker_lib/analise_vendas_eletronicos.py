@@ -1,7 +1,128 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import altair as alt
 
+# Permite importar o pacote compartilhado `dash_utils` (na raiz do repositório)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dash_utils.vendas import (
+    BaseVendas,
+    para_exibicao,
+    relatorio_memoria,
+    versao_arquivo,
+)
+from dash_utils.vendas_sql import ConsultasVendas, backend_vendas
+
+CAMINHO_CSV = "vendas_eletronicos.csv"
+
+# Colunas usadas nas 5 perguntas; as demais não são lidas do disco
+COLUNAS_ANALISE = [
+    "Data_Venda",
+    "País",
+    "Categoria_Produto",
+    "Produto",
+    "Quantidade",
+    "Total_Venda",
+]
+
+
+# Função para responder às 5 perguntas de negócio com o pandas
+def calcular_tabelas(df):
+    vendas_por_mes = df["Data_Venda"].dt.to_period("M").astype(str).rename("Mês")
+    return {
+        "receita_por_categoria": (
+            df.groupby("Categoria_Produto", observed=True)["Total_Venda"]
+            .sum()
+            .reset_index()
+        ),
+        "top_receita": (
+            df.groupby("Produto", observed=True)["Total_Venda"]
+            .sum()
+            .nlargest(5)
+            .reset_index()
+        ),
+        "top_quantidade": (
+            df.groupby("Produto", observed=True)["Quantidade"]
+            .sum()
+            .nlargest(5)
+            .reset_index()
+        ),
+        "vendas_por_pais": (
+            df.groupby("País", observed=True)["Total_Venda"].sum().reset_index()
+        ),
+        "vendas_mensais": (
+            df.groupby(vendas_por_mes)["Total_Venda"].sum().reset_index()
+        ),
+        "ticket_medio": (
+            df.groupby("Categoria_Produto", observed=True)["Total_Venda"]
+            .mean()
+            .reset_index()
+        ),
+    }
+
+
+# Função para responder às mesmas perguntas com consultas SQL (DuckDB); só os
+# resultados agregados vêm para o pandas
+def calcular_tabelas_sql(consultas):
+    por_categoria = consultas.agregar(["Categoria_Produto"])
+    por_produto = consultas.agregar(["Produto"]).set_index("Produto")
+    por_mes = consultas.agregar(["Ano", "Mês"])
+    por_mes["Mês"] = (
+        por_mes["Ano"].astype(str) + "-" + por_mes["Mês"].astype(str).str.zfill(2)
+    )
+    ticket_medio = por_categoria[["Categoria_Produto"]].assign(
+        Total_Venda=por_categoria["Total_Venda"] / por_categoria["Vendas"]
+    )
+    return {
+        "receita_por_categoria": por_categoria[["Categoria_Produto", "Total_Venda"]],
+        "top_receita": por_produto["Total_Venda"].nlargest(5).reset_index(),
+        "top_quantidade": por_produto["Quantidade"].nlargest(5).reset_index(),
+        "vendas_por_pais": consultas.agregar(["País"])[["País", "Total_Venda"]],
+        "vendas_mensais": por_mes[["Mês", "Total_Venda"]],
+        "ticket_medio": ticket_medio,
+    }
+
+
+# Função para carregar a base e calcular o resumo e as tabelas das 5
+# perguntas. Fica em cache por versão do arquivo (`versao`, a chave do cache):
+# as interações seguintes só leem o resultado da memória, sem tocar na base.
+@st.cache_data
+def preparar_analise(versao, usar_sql):
+    if usar_sql:
+        consultas = ConsultasVendas(CAMINHO_CSV)
+        return {
+            "num_linhas": consultas.num_linhas(),
+            "amostra": consultas.amostra(5),
+            "colunas": consultas.esquema(),
+            "tabelas": calcular_tabelas_sql(consultas),
+        }
+    base = BaseVendas(CAMINHO_CSV, COLUNAS_ANALISE)
+    df = base.quadro(COLUNAS_ANALISE)
+    # Nulos e tipos de todas as colunas (dos metadados do arquivo) e memória das
+    # colunas lidas (compacta e com os tipos padrão do pandas)
+    memoria = relatorio_memoria(df).drop(columns="Tipo")
+    colunas = (
+        pd.concat(
+            [
+                base.resumo_colunas().merge(memoria, on="Coluna", how="left"),
+                memoria.tail(1),
+            ],
+            ignore_index=True,
+        )
+        .astype({"Não Nulos": "Int64"})
+        .fillna({"Tipo": ""})
+    )
+    return {
+        "num_linhas": base.num_linhas,
+        "amostra": para_exibicao(base.amostra(5)),
+        "colunas": colunas,
+        "tabelas": calcular_tabelas(df),
+    }
+
+
 # Título do aplicativo
 st.set_page_config(layout="wide")
 st.title("Análise de Vendas de Eletrônicos")
@@ -9,11 +130,11 @@ st.write(
     "Este painel interativo responde a 5 perguntas de negócio com base nos dados de vendas fornecidos."
 )
 
-# 1. Carregar os dados
+# 1. Carregar os dados (com `VENDAS_BACKEND=duckdb`, as análises viram
+# consultas SQL sobre o arquivo, sem carregá-lo inteiro na memória)
+usar_sql = backend_vendas() == "duckdb"
 try:
-    df = pd.read_csv("vendas_eletronicos.csv")
-    # Convertendo a coluna de data para o formato datetime
-    df["Data_Venda"] = pd.to_datetime(df["Data_Venda"])
+    analise = preparar_analise(versao_arquivo(CAMINHO_CSV), usar_sql)
     st.success("Arquivo 'vendas_eletronicos.csv' carregado com sucesso!")
 except FileNotFoundError:
     st.error(
@@ -24,14 +145,16 @@ except FileNotFoundError:
 
 # 2. Resumo dos dados
 st.header("Resumo dos Dados")
-st.write(f"**Total de Registros:** {len(df)}")
+st.write(f"**Total de Registros:** {analise['num_linhas']}")
 col1, col2 = st.columns(2)
 with col1:
     st.write("**Primeiras 5 Linhas:**")
-    st.dataframe(df.head())
+    st.dataframe(analise["amostra"])
 with col2:
     st.write("**Informações do DataFrame:**")
-    st.dataframe(df.info(buf=None))
+    st.dataframe(analise["colunas"], hide_index=True)
+
+tabelas = analise["tabelas"]
 
 
 # --- Análise das 5 Perguntas de Negócio ---
@@ -39,9 +162,7 @@ st.header("Análise das Perguntas de Negócio")
 
 # Pergunta 1: Qual a receita total por categoria de produto?
 st.subheader("1. Receita Total por Categoria de Produto")
-receita_por_categoria = (
-    df.groupby("Categoria_Produto")["Total_Venda"].sum().reset_index()
-)
+receita_por_categoria = tabelas["receita_por_categoria"]
 chart_receita_categoria = (
     alt.Chart(receita_por_categoria)
     .mark_bar()
@@ -60,7 +181,7 @@ st.write(
 # Pergunta 2: Quais são os 5 produtos mais vendidos em termos de quantidade e receita?
 st.subheader("2. Top 5 Produtos Mais Vendidos")
 st.write("**Top 5 por Receita:**")
-top_receita = df.groupby("Produto")["Total_Venda"].sum().nlargest(5).reset_index()
+top_receita = tabelas["top_receita"]
 chart_top_receita = (
     alt.Chart(top_receita)
     .mark_bar()
@@ -73,7 +194,7 @@ chart_top_receita = (
 st.altair_chart(chart_top_receita, use_container_width=True)
 
 st.write("**Top 5 por Quantidade:**")
-top_quantidade = df.groupby("Produto")["Quantidade"].sum().nlargest(5).reset_index()
+top_quantidade = tabelas["top_quantidade"]
 chart_top_quantidade = (
     alt.Chart(top_quantidade)
     .mark_bar()
@@ -91,7 +212,7 @@ st.write(
 
 # Pergunta 3: Qual a distribuição das vendas por país?
 st.subheader("3. Receita Total por País")
-vendas_por_pais = df.groupby("País")["Total_Venda"].sum().reset_index()
+vendas_por_pais = tabelas["vendas_por_pais"]
 chart_vendas_pais = (
     alt.Chart(vendas_por_pais)
     .mark_bar()
@@ -109,9 +230,7 @@ st.write(
 
 # Pergunta 4: Qual a tendência de vendas ao longo do tempo?
 st.subheader("4. Tendência de Vendas Mensais")
-# Agrupar por mês
-df["Mês"] = df["Data_Venda"].dt.to_period("M").astype(str)
-vendas_mensais = df.groupby("Mês")["Total_Venda"].sum().reset_index()
+vendas_mensais = tabelas["vendas_mensais"]
 chart_vendas_mensais = (
     alt.Chart(vendas_mensais)
     .mark_line(point=True)
@@ -128,7 +247,7 @@ st.write(
 
 # Pergunta 5: Qual o ticket médio por categoria de produto?
 st.subheader("5. Ticket Médio por Categoria")
-ticket_medio = df.groupby("Categoria_Produto")["Total_Venda"].mean().reset_index()
+ticket_medio = tabelas["ticket_medio"]
 chart_ticket_medio = (
     alt.Chart(ticket_medio)
     .mark_bar()
@@ -0,0 +1,348 @@
+"""
+Benchmark do gerador de vendas (`generate_dataset.py`).
+
+Mede, para várias quantidades de registros e localidades:
+- vendas por segundo no modo vetorizado (`iter_sales_batches`) e no modo
+  linha a linha (`generate_sale_record`), separando o tempo de geração e o de
+  gravação do arquivo;
+- operações por segundo de `generate_customer` e `generate_customer_email`;
+- o pico de memória (RSS) de cada caso.
+
+Cada caso roda em um processo novo, para que o pico de memória de um não
+contamine o outro. O resultado é um JSON que pode ser comparado entre versões.
+Não usa rede.
+
+Exemplo:
+    python faker_lib/benchmark_generate_dataset.py --registros 1000 100000 \\
+        --locales pt_BR en_US --saida benchmark.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import faker as faker_package
+import numpy as np
+import pandas as pd
+
+import generate_dataset as gd
+
+# Período das vendas usado em todos os casos
+START_DATE = datetime(2020, 1, 1)
+END_DATE = datetime(2023, 12, 31)
+
+
+# Função para ler o pico de memória (RSS) do processo atual, em MB
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return peak / 1024 ** (2 if sys.platform == "darwin" else 1)
+
+
+# --- CASOS DO BENCHMARK (cada um roda em um processo separado) ---
+
+
+def bench_batches(num_records, fmt, use_locale_pools, batch_size, seed):
+    gd.seed_python_generators(seed)
+    phases = {"pools": 0.0, "geracao": 0.0, "escrita": 0.0}
+
+    start = time.perf_counter()
+    locale_pools = gd.LocalePools() if use_locale_pools else None
+    phases["pools"] = time.perf_counter() - start
+
+    customers_pool = gd.CustomerRegistry()
+    batches = gd.iter_sales_batches(
+        num_records,
+        START_DATE,
+        END_DATE,
+        customers_pool,
+        rng=np.random.default_rng(seed),
+        batch_size=batch_size,
+        locale_pools=locale_pools,
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, "vendas" + gd.OUTPUT_FORMATS[fmt])
+        with gd.SalesWriter(output_path, fmt) as writer:
+            while True:
+                start = time.perf_counter()
+                batch = next(batches, None)
+                phases["geracao"] += time.perf_counter() - start
+                if batch is None:
+                    break
+                start = time.perf_counter()
+                writer.write(batch)
+                phases["escrita"] += time.perf_counter() - start
+        file_size = os.path.getsize(output_path)
+
+    # A vazão não inclui a criação dos pools, que é um custo fixo por execução
+    return {
+        "linhas_por_s": num_records / (phases["geracao"] + phases["escrita"]),
+        "tempo_total_s": sum(phases.values()),
+        "fases_s": phases,
+        "clientes": len(customers_pool),
+        "tamanho_arquivo_mb": file_size / 1024**2,
+    }
+
+
+def bench_records(num_records, batch_size, seed):
+    gd.seed_python_generators(seed)
+    phases = {"geracao": 0.0, "escrita": 0.0}
+    customers_pool = gd.CustomerRegistry()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, "vendas.csv")
+        with gd.SalesWriter(output_path, "csv") as writer:
+            for batch_start in range(1, num_records + 1, batch_size):
+                batch_end = min(batch_start + batch_size, num_records + 1)
+                start = time.perf_counter()
+                batch = pd.DataFrame(
+                    [
+                        gd.generate_sale_record(i, START_DATE, END_DATE, customers_pool)
+                        for i in range(batch_start, batch_end)
+                    ]
+                )
+                phases["geracao"] += time.perf_counter() - start
+                start = time.perf_counter()
+                writer.write(batch)
+                phases["escrita"] += time.perf_counter() - start
+
+    total = sum(phases.values())
+    return {
+        "linhas_por_s": num_records / total,
+        "tempo_total_s": total,
+        "fases_s": phases,
+        "clientes": len(customers_pool),
+    }
+
+
+def bench_generate_customer(locale, operations, seed):
+    gd.seed_python_generators(seed)
+    customers_pool = gd.CustomerRegistry()
+    start = time.perf_counter()
+    for _ in range(operations):
+        customers_pool.append(
+            gd.generate_customer(
+                customers_pool.emails, customers_pool.email_counters, locale=locale
+            )
+        )
+    total = time.perf_counter() - start
+    return {"ops_por_s": operations / total, "tempo_total_s": total}
+
+
+def bench_generate_customer_email(locale, operations, seed):
+    gd.seed_python_generators(seed)
+    # Poucos nomes distintos, para exercitar também os sufixos numéricos
+    names = [gd.faker_pool[locale].name() for _ in range(max(1, operations // 10))]
+    emails, counters = set(), {}
+    start = time.perf_counter()
+    for i in range(operations):
+        emails.add(gd.generate_customer_email(names[i % len(names)], emails, counters))
+    total = time.perf_counter() - start
+    return {"ops_por_s": operations / total, "tempo_total_s": total}
+
+
+CASES = {
+    "lote": bench_batches,
+    "registro": bench_records,
+    "generate_customer": bench_generate_customer,
+    "generate_customer_email": bench_generate_customer_email,
+}
+
+
+# Função executada no processo filho: roda o caso e mede a memória
+def _run_case(case, kwargs, queue):
+    rss_start = peak_rss_mb()
+    try:
+        result = CASES[case](**kwargs)
+    except Exception as error:  # O erro vai para o JSON em vez de parar a suíte
+        result = {"erro": repr(error)}
+    result["rss_inicial_mb"] = rss_start
+    result["pico_rss_mb"] = peak_rss_mb()
+    queue.put(result)
+
+
+# Função para rodar um caso em um processo novo e coletar o resultado
+def run_case(case, timeout=None, **kwargs):
+    """
+    Espera o resultado por até `timeout` segundos (sem limite se None). Se o
+    processo filho morrer sem enviar o resultado (ex.: morto por falta de
+    memória), passar do tempo ou terminar com código de saída diferente de
+    zero, o caso é registrado como falho, com o motivo em "erro".
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_case, args=(case, kwargs, results))
+    process.start()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    result = None
+    expired = False
+    while result is None:
+        try:
+            result = results.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                # O resultado pode ter chegado logo antes de o processo terminar
+                try:
+                    result = results.get(timeout=1)
+                except queue.Empty:
+                    pass
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                process.terminate()
+                expired = True
+                break
+    process.join()
+
+    if result is None:
+        if expired:
+            reason = f"tempo limite de {timeout}s excedido"
+        elif process.exitcode < 0:
+            reason = f"processo morto pelo sinal {-process.exitcode}"
+        else:
+            reason = f"processo terminou com código {process.exitcode}"
+        result = {"erro": f"sem resultado: {reason}"}
+    elif process.exitcode != 0:
+        result.setdefault("erro", f"processo terminou com código {process.exitcode}")
+    print(f"{case} {kwargs}: {json.dumps(result, default=float)}", flush=True)
+    return {"caso": case, **kwargs, **result}
+
+
+# Função para identificar a versão do código medida (commit do git, se houver)
+def code_version():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--registros",
+        type=int,
+        nargs="+",
+        default=[10**3, 10**4, 10**5, 10**6, 10**7],
+        help="quantidades de vendas do modo vetorizado (padrão: 1e3 a 1e7)",
+    )
+    parser.add_argument(
+        "--max-registros-linha",
+        type=int,
+        default=10**4,
+        help="maior quantidade medida no modo linha a linha (padrão: 1e4)",
+    )
+    parser.add_argument(
+        "--locales",
+        nargs="+",
+        default=gd.locales,
+        choices=gd.locales,
+        help="localidades de generate_customer/generate_customer_email",
+    )
+    parser.add_argument(
+        "--operacoes",
+        type=int,
+        default=5000,
+        help="chamadas por localidade nos casos de clientes (padrão: 5000)",
+    )
+    parser.add_argument(
+        "--formatos",
+        nargs="+",
+        default=["csv"],
+        choices=gd.OUTPUT_FORMATS,
+        help="formatos gravados no modo vetorizado (padrão: csv)",
+    )
+    parser.add_argument(
+        "--tamanho-lote",
+        type=int,
+        default=gd.DEFAULT_BATCH_SIZE,
+        help="vendas por lote",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="semente (padrão: 42)")
+    parser.add_argument(
+        "--tempo-limite",
+        type=float,
+        default=3600,
+        help="segundos por caso antes de considerá-lo falho (padrão: 3600)",
+    )
+    parser.add_argument(
+        "-o", "--saida", default="benchmark_generate_dataset.json", help="arquivo JSON"
+    )
+    return parser.parse_args(argv)
+
+
+def main(options):
+    results = []
+    for num_records in options.registros:
+        for fmt in options.formatos:
+            for use_locale_pools in (False, True):
+                results.append(
+                    run_case(
+                        "lote",
+                        num_records=num_records,
+                        fmt=fmt,
+                        use_locale_pools=use_locale_pools,
+                        batch_size=options.tamanho_lote,
+                        seed=options.seed,
+                        timeout=options.tempo_limite,
+                    )
+                )
+        if num_records <= options.max_registros_linha:
+            results.append(
+                run_case(
+                    "registro",
+                    num_records=num_records,
+                    batch_size=options.tamanho_lote,
+                    seed=options.seed,
+                    timeout=options.tempo_limite,
+                )
+            )
+
+    for locale in options.locales:
+        for case in ("generate_customer", "generate_customer_email"):
+            results.append(
+                run_case(
+                    case,
+                    locale=locale,
+                    operations=options.operacoes,
+                    seed=options.seed,
+                    timeout=options.tempo_limite,
+                )
+            )
+
+    report = {
+        "versao": code_version(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "faker": faker_package.VERSION,
+        },
+        "parametros": vars(options),
+        "resultados": results,
+    }
+    with open(options.saida, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False, default=float)
+    print(f"Resultados salvos em '{options.saida}'.")
+    falhas = sum("erro" in result for result in results)
+    if falhas:
+        print(f"{falhas} caso(s) falharam; veja o campo 'erro' no JSON.")
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -1,7 +1,29 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
+# Permite importar o pacote compartilhado `dash_utils` (na raiz do repositório)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from dash_utils.clientes import TabelaClientes
+from dash_utils.cubo import CuboOLAP
+from dash_utils.figuras import CacheFiguras
+from dash_utils.memoria import resumo_memoria, somente_leitura, tamanho_memoria
+from dash_utils.resultados import CacheResultados, chave_resultado, versao_codigo
+from dash_utils.vendas import (
+    COLUNAS_DERIVADAS,
+    BaseVendas,
+    BaseVendasMapeada,
+    hash_arquivo,
+    preprocessar_vendas,
+    relatorio_memoria,
+    uuid_texto,
+    versao_arquivo,
+)
+from dash_utils.vendas_sql import ConsultasVendas, backend_vendas
+
 # Configuração da página
 st.set_page_config(
     page_title="Dashboard de Vendas de Eletrônicos",
@@ -61,30 +83,344 @@ st.markdown(
 )
 
 
-# Carregar o dataset com cache para otimização
+# Colunas da base usadas pelos filtros, KPIs e gráficos; as demais (ex.:
+# `Nome_Cliente`, só para o ranking de clientes) são lidas quando usadas
+COLUNAS_PAINEIS = [
+    "Data_Venda",
+    "ID_Cliente",
+    "País",
+    "Categoria_Produto",
+    "Produto",
+    "Quantidade",
+    "Total_Venda",
+]
+
+
+# Carregar o dataset com cache para otimização, só nas colunas usadas. Fora do
+# cache (ex.: após reiniciar o servidor) a leitura usa o sidecar Parquet do CSV,
+# que já traz os tipos certos e é recriado automaticamente quando o CSV muda.
+# Fica em `cache_resource` porque guarda as colunas lidas sob demanda.
+# Com `VENDAS_BACKEND=arrow`, a base vem pré-processada do arquivo Arrow
+# mapeado em memória: várias réplicas do app no mesmo servidor compartilham uma
+# única cópia física dos dados (gere o arquivo antes com
+# `python -m dash_utils.vendas vendas_eletronicos.csv`).
+# A `versao` do CSV (`dataset_version`) entra na chave deste cache e dos que
+# dependem dele: quando o arquivo muda (ex.: linhas anexadas com o servidor no
+# ar), a base, o cubo e a tabela de clientes são recriados juntos, e só a versão
+# atual fica na memória.
+@st.cache_resource(max_entries=1)
+def load_data(versao):
+    try:
+        if backend_vendas() == "arrow":
+            return BaseVendasMapeada("vendas_eletronicos.csv")
+        return BaseVendas("vendas_eletronicos.csv", COLUNAS_PAINEIS)
+    except FileNotFoundError:
+        return None
+
+
+# Pré-processamento (datas e colunas derivadas) também em cache: uma interação
+# com os filtros não converte as datas de novo. Fica em `cache_resource`: todas
+# as sessões usam o mesmo DataFrame, sem uma cópia por sessão (o `cache_data`
+# devolveria uma cópia a cada chamada), e ele reaproveita as colunas lidas da
+# base. Os arrays do resultado são marcados como somente leitura: uma alteração
+# no lugar lança erro em vez de mudar a base de todas as sessões.
+@st.cache_resource(max_entries=1)
+def preprocess_data(versao):
+    base = load_data(versao)
+    if base is None:
+        return None
+    if set(COLUNAS_DERIVADAS) <= set(base.colunas):  # Base Arrow já pré-processada
+        return somente_leitura(base.quadro([*COLUNAS_PAINEIS, *COLUNAS_DERIVADAS]))
+    return somente_leitura(preprocessar_vendas(base.quadro(COLUNAS_PAINEIS)))
+
+
+# Memória da base compartilhada, medida uma vez (a base não muda depois de
+# carregada): a cada interação só os resultados da sessão são medidos
+@st.cache_resource(max_entries=1)
+def shared_memory(versao):
+    return tamanho_memoria(preprocess_data(versao), profundo=True)
+
+
+# Memória ocupada pela base com os tipos compactos, comparada com a estimativa
+# para os tipos padrão do `pd.read_csv`
+@st.cache_data(max_entries=1)
+def memory_report(versao):
+    return relatorio_memoria(preprocess_data(versao))
+
+
+# Cubo com as vendas pré-agregadas pelas dimensões dos filtros e gráficos.
+# Os KPIs e gráficos que não dependem do cliente são respondidos pelo cubo, cujo
+# tamanho não cresce com o número de vendas. Fica em `cache_resource` para não
+# ser copiado a cada interação; o cubo não é alterado depois de criado.
+@st.cache_resource(max_entries=1)
+def build_cube(versao):
+    df = preprocess_data(versao)
+    if df is None:
+        return None
+    return CuboOLAP(
+        df,
+        dimensoes=[
+            "Ano",
+            "Trimestre",
+            "Mês",
+            "Hora",
+            "Categoria_Produto",
+            "Produto",
+            "País",
+        ],
+        medidas={
+            "Total_Venda": ("Total_Venda", "sum"),
+            "Quantidade": ("Quantidade", "sum"),
+            "Vendas": ("Total_Venda", "size"),
+        },
+        filtros=["Ano", "Trimestre", "Categoria_Produto"],
+        rollups=[("Produto",), ("País",), ("Ano", "Mês"), ("Hora",)],
+    )
+
+
+# Tabela de vendas por cliente (por ID_Cliente) em cada combinação dos filtros,
+# para os KPIs e o ranking de clientes sem percorrer as vendas
+@st.cache_resource(max_entries=1)
+def build_customer_table(versao):
+    base, df = load_data(versao), preprocess_data(versao)
+    if df is None:
+        return None
+    return TabelaClientes(
+        df,
+        ["Ano", "Trimestre", "Categoria_Produto"],
+        ler_nomes=lambda linhas: customer_names(base, linhas),
+    )
+
+
+# Nomes dos clientes nas `linhas` da base; a coluna de nomes só é lida do disco
+# quando o ranking de clientes é mostrado pela primeira vez
+def customer_names(base, linhas):
+    return base["Nome_Cliente"].iloc[linhas].to_numpy()
+
+
+# Backend SQL opcional (`VENDAS_BACKEND=duckdb`): filtros e agregações viram
+# consultas ao DuckDB sobre os arquivos, sem carregar a base no pandas
+@st.cache_resource(max_entries=1)
+def connect_sql(versao):
+    try:
+        return ConsultasVendas("vendas_eletronicos.csv")
+    except FileNotFoundError:
+        return None
+
+
 @st.cache_data
-def load_data():
+def sql_options(versao, coluna):
+    return connect_sql(versao).opcoes(coluna)
+
+
+# Função para listar as opções de um filtro pelo backend SQL, na versão atual
+def sql_filter_options(coluna):
+    return sql_options(versao, coluna)
+
+
+# Função para calcular os dados dos painéis pelo cubo e pela tabela de clientes
+def query_panels_pandas(selecao):
+    return {
+        "totais": cubo.consultar(selecao),
+        "clientes_unicos": tabela_clientes.clientes_unicos(selecao),
+        "produtos": cubo.consultar(selecao, por=["Produto"]),
+        "paises": cubo.consultar(selecao, por=["País"]),
+        "meses": cubo.consultar(selecao, por=["Ano", "Mês"]),
+        "horas": cubo.consultar(selecao, por=["Hora"]),
+    }
+
+
+# Função para o ranking de clientes, calculado só quando o painel é mostrado
+def query_top_clients_pandas(selecao):
+    return tabela_clientes.top(selecao, n=5)
+
+
+# Função para listar as opções de um filtro a partir do cubo
+def cube_options(coluna):
+    return sorted(cubo.celulas[coluna].unique())
+
+
+# Os mesmos dados pelo backend SQL, pela conexão da versão atual da base
+def query_panels_sql(selecao):
+    totais = consultas.totais(selecao)
+    return {
+        "totais": totais,
+        "clientes_unicos": totais["Clientes"],
+        "produtos": consultas.agregar(["Produto"], selecao),
+        "paises": consultas.agregar(["País"], selecao),
+        "meses": consultas.agregar(["Ano", "Mês"], selecao),
+        "horas": consultas.agregar(["Hora"], selecao),
+    }
+
+
+# Ranking de clientes pelo backend SQL
+def query_top_clients_sql(selecao):
+    return consultas.top_clientes(selecao, n=5)
+
+
+# Cache em disco dos resultados dos painéis (ao lado do CSV): sobrevive a
+# reinícios do servidor e é compartilhado pelas réplicas do app
+@st.cache_resource
+def open_result_cache():
+    return CacheResultados("vendas_eletronicos.csv.resultados.sqlite")
+
+
+# Versão do CSV (tamanho e data de modificação), lida a cada interação; None
+# se o arquivo não existir
+def dataset_version():
     try:
-        return pd.read_csv("vendas_eletronicos.csv")
+        return versao_arquivo("vendas_eletronicos.csv")
     except FileNotFoundError:
         return None
 
 
-df = load_data()
+# Hash do conteúdo do CSV, calculado uma vez por versão do arquivo (backend
+# SQL, que lê os arquivos a cada consulta)
+@st.cache_resource(max_entries=1)
+def dataset_hash(versao):
+    return hash_arquivo("vendas_eletronicos.csv")
+
 
-if df is None:
+# Função para buscar um resultado no cache em disco (chave: conteúdo da base
+# carregada, código do cálculo, backend, painel e filtros) ou calculá-lo e
+# guardá-lo
+def cached_result(painel, selecao, calcular):
+    chave = chave_resultado(
+        hash_base,
+        versao_codigo(calcular),
+        backend_vendas(),
+        painel,
+        selecao,
+    )
+    return open_result_cache().obter(chave, lambda: calcular(selecao))
+
+
+# Figuras Plotly prontas, compartilhadas pelas sessões: um filtro que não muda
+# o dado de um gráfico não monta a figura de novo
+@st.cache_resource
+def figure_cache():
+    return CacheFiguras(max_figuras=128)
+
+
+# Função para buscar a figura de um gráfico (chave: nome e hash do dado de
+# entrada) ou montá-la com `criar(dados)`
+def cached_figure(grafico, dados, criar):
+    return figure_cache().obter(grafico, dados, criar)
+
+
+# Funções para montar as figuras dos painéis a partir dos dados agregados
+def figure_top_products_value(top_produtos_valor):
+    fig = px.bar(
+        top_produtos_valor,
+        x="Total_Venda",
+        y="Produto",
+        title="Top 5 Produtos por Vendas",
+        orientation="h",
+        color="Produto",
+        labels={"Total_Venda": "Vendas Totais ($)", "Produto": "Produto"},
+        color_discrete_sequence=px.colors.qualitative.Vivid,
+    )
+    fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    return fig
+
+
+def figure_top_products_quantity(top_produtos_qtd):
+    fig = px.bar(
+        top_produtos_qtd,
+        x="Quantidade",
+        y="Produto",
+        title="Top 5 Produtos por Quantidade Vendida",
+        orientation="h",
+        color="Produto",
+        labels={"Quantidade": "Quantidade Vendida", "Produto": "Produto"},
+        color_discrete_sequence=px.colors.qualitative.T10,
+    )
+    fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    return fig
+
+
+def figure_country_map(vendas_por_pais):
+    return px.choropleth(
+        vendas_por_pais,
+        locations="País",
+        locationmode="country names",
+        color="Total_Venda",
+        hover_name="País",
+        color_continuous_scale=px.colors.sequential.Plasma,
+        title="Vendas Totais por País",
+        labels={"Total_Venda": "Vendas Totais ($)"},
+    )
+
+
+def figure_top_clients(top_clientes_vendas):
+    fig = px.bar(
+        top_clientes_vendas,
+        x="Total_Venda",
+        y="Nome_Cliente",
+        title="Top 5 Clientes por Vendas",
+        orientation="h",
+        color="Nome_Cliente",
+        labels={
+            "Total_Venda": "Vendas Totais ($)",
+            "Nome_Cliente": "Nome do Cliente",
+        },
+        color_discrete_sequence=px.colors.qualitative.Bold,
+    )
+    fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    return fig
+
+
+def figure_monthly_sales(vendas_por_mes):
+    return px.bar(
+        vendas_por_mes,
+        x="Data",
+        y="Total_Venda",
+        title="Vendas Totais por Mês",
+        labels={"Data": "Ano-Mês", "Total_Venda": "Vendas Totais ($)"},
+        color_discrete_sequence=px.colors.qualitative.Plotly,
+    )
+
+
+def figure_hourly_sales(vendas_por_hora):
+    fig = px.bar(
+        vendas_por_hora,
+        x="Hora",
+        y="Total_Venda",
+        title="Vendas por Hora do Dia",
+        labels={"Hora": "Hora do Dia", "Total_Venda": "Vendas Totais ($)"},
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+    )
+    fig.update_layout(xaxis={"dtick": 1})
+    return fig
+
+
+usar_sql = backend_vendas() == "duckdb"
+versao = dataset_version()
+if usar_sql:
+    consultas = connect_sql(versao)
+    dados_carregados = consultas is not None
+    filter_options = sql_filter_options
+    query_panels = query_panels_sql
+    query_top_clients = query_top_clients_sql
+else:
+    base = load_data(versao)
+    df = preprocess_data(versao)
+    cubo = build_cube(versao)
+    tabela_clientes = build_customer_table(versao)
+    dados_carregados = df is not None
+    filter_options = cube_options
+    query_panels = query_panels_pandas
+    query_top_clients = query_top_clients_pandas
+
+if not dados_carregados:
     st.error(
         "Arquivo 'vendas_eletronicos.csv' não encontrado. Por favor, verifique se o arquivo está na raiz do repositório."
     )
     st.stop()
 
-
-# Limpeza e Pré-processamento dos Dados
-df["Data_Venda"] = pd.to_datetime(df["Data_Venda"])
-df["Ano"] = df["Data_Venda"].dt.year
-df["Mês"] = df["Data_Venda"].dt.month
-df["Trimestre"] = df["Data_Venda"].dt.quarter
-df["Hora"] = df["Data_Venda"].dt.hour
+# Hash do conteúdo da base efetivamente carregada (gravado com o sidecar ou o
+# arquivo Arrow que ela abriu), que identifica os resultados em cache
+hash_base = dataset_hash(versao) if usar_sql else base.origem["hash"]
 
 
 # Título principal do dashboard
@@ -97,7 +433,7 @@ st.sidebar.header("Filtros")
 
 
 # Filtro por Ano
-anos_disponiveis = sorted(df["Ano"].unique())
+anos_disponiveis = filter_options("Ano")
 anos_selecionados = st.sidebar.multiselect(
     "Selecione o(s) Ano(s)",
     options=anos_disponiveis,
@@ -106,7 +442,7 @@ anos_selecionados = st.sidebar.multiselect(
 
 
 # Filtro por Trimestre
-trimestres_disponiveis = sorted(df["Trimestre"].unique())
+trimestres_disponiveis = filter_options("Trimestre")
 trimestres_selecionados = st.sidebar.multiselect(
     "Selecione o(s) Trimestre(s)",
     options=trimestres_disponiveis,
@@ -114,7 +450,7 @@ trimestres_selecionados = st.sidebar.multiselect(
 )
 
 # Filtro por Categoria de Produto
-categorias_disponiveis = sorted(df["Categoria_Produto"].unique())
+categorias_disponiveis = filter_options("Categoria_Produto")
 categorias_selecionadas = st.sidebar.multiselect(
     "Selecione a(s) Categoria(s)",
     options=categorias_disponiveis,
@@ -122,16 +458,18 @@ categorias_selecionadas = st.sidebar.multiselect(
 )
 
 
-# Filtrar o DataFrame
-df_filtrado = df[
-    (df["Ano"].isin(anos_selecionados))
-    & (df["Trimestre"].isin(trimestres_selecionados))
-    & (df["Categoria_Produto"].isin(categorias_selecionadas))
-]
+# Filtros selecionados e dados de todos os painéis
+selecao = {
+    "Ano": anos_selecionados,
+    "Trimestre": trimestres_selecionados,
+    "Categoria_Produto": categorias_selecionadas,
+}
+paineis = cached_result("paineis", selecao, query_panels)
+totais = paineis["totais"]
 
 
 # Mensagem de alerta se nenhum dado for encontrado
-if df_filtrado.empty:
+if totais["Vendas"] == 0:
     st.warning("Nenhum dado encontrado para os filtros selecionados.")
 else:
     # --- Visualizações ---
@@ -142,20 +480,20 @@ else:
 
     with col1_metric:
         # Exibir o valor total de vendas como um KPI
-        total_vendas = df_filtrado["Total_Venda"].sum()
+        total_vendas = totais["Total_Venda"]
         st.metric(label="Total de Vendas", value=f"US$ {total_vendas:,.2f}")
 
     with col2_metric:
         # Calcular e exibir o ticket médio por venda
-        if not df_filtrado.empty:
-            ticket_medio = df_filtrado["Total_Venda"].mean()
+        if totais["Vendas"] > 0:
+            ticket_medio = totais["Total_Venda"] / totais["Vendas"]
             st.metric(label="Ticket Médio por Venda", value=f"US$ {ticket_medio:,.2f}")
         else:
             st.metric(label="Ticket Médio por Venda", value="US$ 0.00")
 
     with col3_metric:
         # Calcular e exibir o número de clientes únicos
-        num_clientes_unicos = df_filtrado["ID_Cliente"].nunique()
+        num_clientes_unicos = paineis["clientes_unicos"]
         st.metric(label="Clientes Únicos", value=num_clientes_unicos)
 
     # Criar colunas para colocar os gráficos de produtos lado a lado
@@ -165,41 +503,28 @@ else:
     with col1_produtos:
         st.subheader("Top 5 Produtos por Vendas")
         top_produtos_valor = (
-            df_filtrado.groupby("Produto")["Total_Venda"]
-            .sum()
+            paineis["produtos"]
+            .set_index("Produto")["Total_Venda"]
             .nlargest(5)
             .reset_index()
         )
-        fig_prod_valor = px.bar(
-            top_produtos_valor,
-            x="Total_Venda",
-            y="Produto",
-            title="Top 5 Produtos por Vendas",
-            orientation="h",
-            color="Produto",
-            labels={"Total_Venda": "Vendas Totais ($)", "Produto": "Produto"},
-            color_discrete_sequence=px.colors.qualitative.Vivid,
+        fig_prod_valor = cached_figure(
+            "produtos_valor", top_produtos_valor, figure_top_products_value
         )
-        fig_prod_valor.update_layout(yaxis={"categoryorder": "total ascending"})
         st.plotly_chart(fig_prod_valor, use_container_width=True)
 
     # Top 5 Produtos por Quantidade Vendida
     with col2_produtos:
         st.subheader("Top 5 Produtos por Quantidade")
         top_produtos_qtd = (
-            df_filtrado.groupby("Produto")["Quantidade"].sum().nlargest(5).reset_index()
+            paineis["produtos"]
+            .set_index("Produto")["Quantidade"]
+            .nlargest(5)
+            .reset_index()
         )
-        fig_prod_qtd = px.bar(
-            top_produtos_qtd,
-            x="Quantidade",
-            y="Produto",
-            title="Top 5 Produtos por Quantidade Vendida",
-            orientation="h",
-            color="Produto",
-            labels={"Quantidade": "Quantidade Vendida", "Produto": "Produto"},
-            color_discrete_sequence=px.colors.qualitative.T10,
+        fig_prod_qtd = cached_figure(
+            "produtos_quantidade", top_produtos_qtd, figure_top_products_quantity
         )
-        fig_prod_qtd.update_layout(yaxis={"categoryorder": "total ascending"})
         st.plotly_chart(fig_prod_qtd, use_container_width=True)
 
     # Criar colunas para o mapa e o top 5 clientes
@@ -208,42 +533,25 @@ else:
     with col1_mapa:
         # Vendas por País (o mapa)
         st.subheader("Vendas por País")
-        vendas_por_pais = df_filtrado.groupby("País")["Total_Venda"].sum().reset_index()
-        fig_mapa = px.choropleth(
-            vendas_por_pais,
-            locations="País",
-            locationmode="country names",
-            color="Total_Venda",
-            hover_name="País",
-            color_continuous_scale=px.colors.sequential.Plasma,
-            title="Vendas Totais por País",
-            labels={"Total_Venda": "Vendas Totais ($)"},
-        )
+        vendas_por_pais = paineis["paises"][["País", "Total_Venda"]]
+        fig_mapa = cached_figure("paises", vendas_por_pais, figure_country_map)
         st.plotly_chart(fig_mapa, use_container_width=True)
 
     with col2_clientes:
         # Top 5 Clientes
         st.subheader("Top 5 Clientes")
-        top_clientes_vendas = (
-            df_filtrado.groupby("Nome_Cliente")["Total_Venda"]
-            .sum()
-            .nlargest(5)
-            .reset_index()
+        top_clientes_vendas = cached_result("top_clientes", selecao, query_top_clients)
+        # Clientes homônimos aparecem com o início do ID, para não virarem uma
+        # barra só no gráfico
+        nomes = top_clientes_vendas["Nome_Cliente"].astype(str)
+        homonimos = nomes.duplicated(keep=False)
+        top_clientes_vendas["Nome_Cliente"] = nomes.where(
+            ~homonimos,
+            nomes + " (" + uuid_texto(top_clientes_vendas["ID_Cliente"]).str[:8] + ")",
         )
-        fig_clientes = px.bar(
-            top_clientes_vendas,
-            x="Total_Venda",
-            y="Nome_Cliente",
-            title="Top 5 Clientes por Vendas",
-            orientation="h",
-            color="Nome_Cliente",
-            labels={
-                "Total_Venda": "Vendas Totais ($)",
-                "Nome_Cliente": "Nome do Cliente",
-            },
-            color_discrete_sequence=px.colors.qualitative.Bold,
+        fig_clientes = cached_figure(
+            "top_clientes", top_clientes_vendas, figure_top_clients
         )
-        fig_clientes.update_layout(yaxis={"categoryorder": "total ascending"})
         st.plotly_chart(fig_clientes, use_container_width=True)
 
     # Criar colunas para os gráficos de tempo
@@ -251,33 +559,24 @@ else:
 
     with col1_mes:
         st.subheader("Vendas Totais por Mês")
-        vendas_por_mes = (
-            df_filtrado.groupby(["Ano", "Mês"])["Total_Venda"].sum().reset_index()
-        )
+        vendas_por_mes = paineis["meses"][["Ano", "Mês", "Total_Venda"]].copy()
         vendas_por_mes["Data"] = (
             vendas_por_mes["Ano"].astype(str) + "-" + vendas_por_mes["Mês"].astype(str)
         )
-        fig_mes = px.bar(
-            vendas_por_mes,
-            x="Data",
-            y="Total_Venda",
-            title="Vendas Totais por Mês",
-            labels={"Data": "Ano-Mês", "Total_Venda": "Vendas Totais ($)"},
-            color_discrete_sequence=px.colors.qualitative.Plotly,
-        )
+        fig_mes = cached_figure("meses", vendas_por_mes, figure_monthly_sales)
         st.plotly_chart(fig_mes, use_container_width=True)
 
     with col2_hora:
         # Vendas por Hora do Dia
         st.subheader("Vendas por Hora do Dia")
-        vendas_por_hora = df_filtrado.groupby("Hora")["Total_Venda"].sum().reset_index()
-        fig_hora = px.bar(
-            vendas_por_hora,
-            x="Hora",
-            y="Total_Venda",
-            title="Vendas por Hora do Dia",
-            labels={"Hora": "Hora do Dia", "Total_Venda": "Vendas Totais ($)"},
-            color_discrete_sequence=px.colors.qualitative.Pastel,
-        )
-        fig_hora.update_layout(xaxis={"dtick": 1})
+        vendas_por_hora = paineis["horas"][["Hora", "Total_Venda"]]
+        fig_hora = cached_figure("horas", vendas_por_hora, figure_hourly_sales)
         st.plotly_chart(fig_hora, use_container_width=True)
+
+
+# Memória da base carregada, compartilhada pelas sessões, e dos resultados
+# desta sessão (o backend SQL não mantém a base na memória)
+if not usar_sql:
+    with st.sidebar.expander("Memória da base"):
+        st.dataframe(memory_report(versao), hide_index=True)
+        st.caption(resumo_memoria(shared_memory(versao), paineis))
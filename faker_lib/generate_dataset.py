@@ -1,6 +1,16 @@
 import pandas as pd
+import numpy as np
 from faker import Faker
+import argparse
+import hashlib
+import multiprocessing
+import os
+import pickle
 import random
+import shutil
+import sys
+import time
+import uuid
 from datetime import datetime, timedelta
 
 # Inicializando a Faker com várias localidades para ter clientes globais
@@ -16,6 +26,10 @@ locales = [
 ]
 faker = Faker(locales)
 
+# Uma instância Faker por localidade, criada uma única vez (criar `Faker(locale)`
+# a cada cliente recarrega os dados dos providers)
+faker_pool = {locale: faker[locale] for locale in locales}
+
 # Definindo produtos, categorias e seus preços
 produtos_eletronicos = {
     "Celulares": {
@@ -43,9 +57,37 @@ for category, products in produtos_eletronicos.items():
             {"categoria": category, "produto": product, "preco_unitario": price}
         )
 
+# Mesmos produtos em arrays, para o modo vetorizado selecionar por índice
+product_categories = np.array([p["categoria"] for p in all_products], dtype=object)
+product_names = np.array([p["produto"] for p in all_products], dtype=object)
+product_prices = np.array([p["preco_unitario"] for p in all_products])
+
+# Probabilidade de uma venda ser feita por um cliente já existente
+REPEAT_CUSTOMER_RATE = 0.7
+
+# Quantidade de vendas geradas por lote no modo vetorizado
+DEFAULT_BATCH_SIZE = 100_000
+
+# Tamanho dos shards no modo paralelo: por padrão o total é dividido em
+# `TARGET_SHARDS` shards (para ocupar todos os processos), cada um com entre
+# `MIN_SHARD_SIZE` e `DEFAULT_SHARD_SIZE` vendas. O particionamento depende só
+# do total de registros, então a saída para uma mesma semente não muda com o
+# número de processos.
+DEFAULT_SHARD_SIZE = 1_000_000
+MIN_SHARD_SIZE = 10_000
+TARGET_SHARDS = 64
+
+# Quantidade de nomes e países pré-sorteados por localidade (ver `LocalePools`)
+DEFAULT_LOCALE_POOL_SIZE = 20_000
+
 
 # Função para gerar um email a partir de um nome, garantindo que seja único
-def generate_customer_email(customer_name, existing_emails):
+def generate_customer_email(customer_name, existing_emails, email_counters=None):
+    """
+    `existing_emails` deve ser um set (busca por hash). Se `email_counters`
+    for informado, guarda o próximo sufixo livre de cada base@domínio, de modo
+    que nomes repetidos não precisem testar os sufixos já usados.
+    """
     name_parts = customer_name.lower().split()
     first_name = name_parts[0]
     last_name = name_parts[-1] if len(name_parts) > 1 else ""
@@ -55,19 +97,28 @@ def generate_customer_email(customer_name, existing_emails):
     customer_email = f"{base_email}@{email_domain}"
 
     # Garantir que o email seja único
-    counter = 1
-    while customer_email in existing_emails:
-        customer_email = f"{base_email}{counter}@{email_domain}"
+    if customer_email not in existing_emails:
+        return customer_email
+
+    counter = email_counters.get(customer_email, 1) if email_counters is not None else 1
+    candidate = f"{base_email}{counter}@{email_domain}"
+    while candidate in existing_emails:
         counter += 1
-    return customer_email
+        candidate = f"{base_email}{counter}@{email_domain}"
+    if email_counters is not None:
+        email_counters[customer_email] = counter + 1
+    return candidate
 
 
 # Função para gerar um cliente
-def generate_customer(existing_customers_emails):
-    locale = random.choice(locales)
-    faker_locale = Faker(locale)
+def generate_customer(existing_customers_emails, email_counters=None, locale=None):
+    if locale is None:
+        locale = random.choice(locales)
+    faker_locale = faker_pool[locale]
     customer_name = faker_locale.name()
-    customer_email = generate_customer_email(customer_name, existing_customers_emails)
+    customer_email = generate_customer_email(
+        customer_name, existing_customers_emails, email_counters
+    )
     customer_country = faker_locale.country()
 
     return {
@@ -78,17 +129,143 @@ def generate_customer(existing_customers_emails):
     }
 
 
+# Posições dos hífens no texto de um UUID (8-4-4-4-12)
+_UUID_HEX_POSITIONS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+
+class CustomerRegistry:
+    """
+    Pool de clientes em formato colunar, pensado para milhões de clientes.
+
+    - `ID_Cliente` fica em 16 bytes por cliente (e não como texto);
+    - `País` é guardado como código inteiro de um dicionário de países;
+    - nomes e emails ficam em arrays de objetos, o que permite selecionar
+      vários clientes por índice de uma só vez (`take`);
+    - `emails` é um set e `email_counters` guarda o próximo sufixo de cada
+      base de email, tornando a geração de emails únicos O(1) amortizada.
+    """
+
+    def __init__(self, capacity=1024):
+        self._size = 0
+        self._ids = np.empty((capacity, 16), dtype=np.uint8)
+        self._names = np.empty(capacity, dtype=object)
+        self._emails = np.empty(capacity, dtype=object)
+        self._country_codes = np.empty(capacity, dtype=np.int16)
+        self.countries = []
+        self._country_index = {}
+        self.emails = set()
+        self.email_counters = {}
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i):
+        if not -self._size <= i < self._size:
+            raise IndexError("índice de cliente fora do pool")
+        i %= self._size
+        return {
+            "ID_Cliente": str(uuid.UUID(bytes=self._ids[i].tobytes())),
+            "Nome_Cliente": self._names[i],
+            "Email_Cliente": self._emails[i],
+            "País": self.countries[self._country_codes[i]],
+        }
+
+    def _grow(self, min_capacity):
+        capacity = max(min_capacity, 2 * len(self._names))
+        ids = np.empty((capacity, 16), dtype=np.uint8)
+        ids[: self._size] = self._ids[: self._size]
+        self._ids = ids
+        for attr, dtype in (
+            ("_names", object),
+            ("_emails", object),
+            ("_country_codes", np.int16),
+        ):
+            column = np.empty(capacity, dtype=dtype)
+            column[: self._size] = getattr(self, attr)[: self._size]
+            setattr(self, attr, column)
+
+    def _country_code(self, country):
+        code = self._country_index.get(country)
+        if code is None:
+            code = self._country_index[country] = len(self.countries)
+            self.countries.append(country)
+        return code
+
+    def new_email(self, customer_name):
+        """Gera um email único para o nome, usando o índice do registro."""
+        return generate_customer_email(customer_name, self.emails, self.email_counters)
+
+    def append(self, customer):
+        self.extend([customer])
+
+    def extend(self, customers):
+        customers = list(customers)
+        raw_ids = np.array(
+            [list(uuid.UUID(c["ID_Cliente"]).bytes) for c in customers], dtype=np.uint8
+        ).reshape(-1, 16)
+        self.extend_columns(
+            raw_ids,
+            [c["Nome_Cliente"] for c in customers],
+            [c["Email_Cliente"] for c in customers],
+            [c["País"] for c in customers],
+        )
+
+    def extend_columns(self, raw_ids, names, emails, countries):
+        """Adiciona clientes já em colunas (`raw_ids` com 16 bytes por linha)."""
+        end = self._size + len(names)
+        if end > len(self._names):
+            self._grow(end)
+        self._ids[self._size : end] = raw_ids
+        self._names[self._size : end] = names
+        self._emails[self._size : end] = emails
+        self._country_codes[self._size : end] = [
+            self._country_code(country) for country in countries
+        ]
+        self.emails.update(emails)
+        self._size = end
+
+    def columns(self, start=0, stop=None):
+        """Colunas dos clientes `start:stop`, no formato de `extend_columns`."""
+        stop = self._size if stop is None else min(stop, self._size)
+        return {
+            "raw_ids": self._ids[start:stop].copy(),
+            "names": self._names[start:stop].copy(),
+            "emails": self._emails[start:stop].tolist(),
+            "countries": np.asarray(self.countries, dtype=object)[
+                self._country_codes[start:stop]
+            ],
+        }
+
+    def take(self, indices):
+        """Retorna as colunas de clientes para um array de índices."""
+        raw_ids = self._ids[indices]
+        hex_ids = np.frombuffer(raw_ids.tobytes().hex().encode("ascii"), np.uint8)
+        text_ids = np.full((len(indices), 36), ord("-"), dtype=np.uint8)
+        text_ids[:, _UUID_HEX_POSITIONS] = hex_ids.reshape(-1, 32)
+        return {
+            "ID_Cliente": text_ids.view("S36").ravel().astype(str),
+            "Nome_Cliente": self._names[indices],
+            "Email_Cliente": self._emails[indices],
+            "País": np.asarray(self.countries, dtype=object)[
+                self._country_codes[indices]
+            ],
+        }
+
+
 # Função para gerar um único registro de venda
 def generate_sale_record(sale_id, start_date, end_date, customers_pool):
+    """`customers_pool` é um `CustomerRegistry`."""
 
     # Lógica para escolher um cliente existente ou criar um novo
     if (
-        random.random() < 0.7 and customers_pool
+        random.random() < REPEAT_CUSTOMER_RATE and customers_pool
     ):  # 70% de chance de ser cliente recorrente
         customer = random.choice(customers_pool)
     else:
         # Se for um novo cliente, criamos um e adicionamos ao pool
-        new_customer = generate_customer([c["Email_Cliente"] for c in customers_pool])
+        new_customer = generate_customer(
+            customers_pool.emails, customers_pool.email_counters
+        )
         customers_pool.append(new_customer)
         customer = new_customer
 
@@ -116,54 +293,1283 @@ def generate_sale_record(sale_id, start_date, end_date, customers_pool):
     }
 
 
-# Coleta de informações do usuário
-nome_arquivo = input("Insira o nome do arquivo (ex: 'meu_arquivo.csv'): ")
+# --- MODO VETORIZADO (EM LOTES) ---
 
-try:
-    num_records_input = input("Insira a quantidade de registros que deseja criar: ")
-    num_records = int(num_records_input) if num_records_input.strip() else 10000
 
-    # --- INÍCIO DAS MODIFICAÇÕES ---
-    year_start_input = input("Insira o ano de início para as vendas (ex: '2020'): ")
-    year_end_input = input("Insira o ano de fim para as vendas (ex: '2023'): ")
+class LocalePools:
+    """
+    Nomes e países pré-sorteados em massa para cada localidade. Com eles,
+    criar um cliente custa alguns acessos a arrays por índice, em vez de
+    chamadas ao Faker. Em troca, os nomes se repetem mais (o pool tem
+    `size` nomes por localidade), o que só aumenta os sufixos numéricos
+    dos emails.
+    """
 
-    # Define valores padrão caso o usuário não insira nada
-    year_start = int(year_start_input) if year_start_input.strip() else 2020
-    year_end = int(year_end_input) if year_end_input.strip() else datetime.now().year
+    def __init__(self, size=DEFAULT_LOCALE_POOL_SIZE):
+        self.size = size
+        self.names = {}
+        self.countries = {}
+        for locale, faker_locale in faker_pool.items():
+            self.names[locale] = np.array(
+                [faker_locale.name() for _ in range(size)], dtype=object
+            )
+            self.countries[locale] = np.array(
+                [faker_locale.country() for _ in range(size)], dtype=object
+            )
 
-    start_date = datetime(year_start, 1, 1)
-    end_date = datetime(year_end, 12, 31)
 
-    # --- FIM DAS MODIFICAÇÕES ---
+# Função para gerar UUIDs versão 4 aleatórios em bloco (16 bytes por linha)
+def random_uuid4_bytes(num_ids, rng):
+    raw_ids = rng.integers(0, 256, size=(num_ids, 16), dtype=np.uint8)
+    raw_ids[:, 6] = (raw_ids[:, 6] & 0x0F) | 0x40  # Versão 4
+    raw_ids[:, 8] = (raw_ids[:, 8] & 0x3F) | 0x80  # Variante RFC 4122
+    return raw_ids
+
+
+# Função para sortear clientes a partir dos pools pré-sorteados
+def _draw_customers_from_pools(num_customers, rng, locale_pools):
+    locale_idx = rng.integers(0, len(locales), size=num_customers)
+    names = np.empty(num_customers, dtype=object)
+    countries = np.empty(num_customers, dtype=object)
+    for code, locale in enumerate(locales):
+        mask = locale_idx == code
+        names[mask] = locale_pools.names[locale][
+            rng.integers(0, locale_pools.size, size=mask.sum())
+        ]
+        countries[mask] = locale_pools.countries[locale][
+            rng.integers(0, locale_pools.size, size=mask.sum())
+        ]
+    return {
+        "raw_ids": random_uuid4_bytes(num_customers, rng),
+        "names": names,
+        "countries": countries,
+    }
+
+
+# Função para sortear nomes, países e IDs de clientes novos (sem os emails)
+def draw_customers(num_customers, rng, locale_pools=None):
+    """
+    Sorteia `num_customers` clientes e retorna suas colunas (`raw_ids`,
+    `names`, `countries`). Com `locale_pools` (um `LocalePools`), nomes e
+    países são sorteados por índice nos pools pré-gerados; sem ele, cada
+    cliente chama o Faker da sua localidade. Os emails, que precisam ser
+    únicos no pool inteiro, são criados depois, em `add_customers`.
+    """
+    if locale_pools is not None:
+        return _draw_customers_from_pools(num_customers, rng, locale_pools)
+
+    customer_locales = rng.choice(locales, size=num_customers)
+
+    names = []
+    raw_ids = []
+    countries = []
+    for locale in customer_locales:
+        faker_locale = faker_pool[locale]
+        names.append(faker_locale.name())
+        raw_ids.append(uuid.UUID(faker.uuid4()).bytes)
+        countries.append(faker_locale.country())
+    return {
+        "raw_ids": np.frombuffer(b"".join(raw_ids), np.uint8).reshape(-1, 16),
+        "names": names,
+        "countries": countries,
+    }
+
+
+# Função para criar os emails dos clientes sorteados e adicioná-los ao pool
+def add_customers(customers_pool, customers):
+    emails = []
+    for customer_name in customers["names"]:
+        customer_email = customers_pool.new_email(customer_name)
+        customers_pool.emails.add(customer_email)
+        emails.append(customer_email)
+    customers_pool.extend_columns(
+        customers["raw_ids"], customers["names"], emails, customers["countries"]
+    )
+
+
+# Função para gerar de uma só vez os novos clientes de um lote
+def generate_customers_batch(num_customers, customers_pool, rng, locale_pools=None):
+    """
+    Gera `num_customers` clientes (`draw_customers`) e os adiciona ao
+    `CustomerRegistry`, com emails únicos.
+    """
+    add_customers(customers_pool, draw_customers(num_customers, rng, locale_pools))
+
+
+# Função para sortear o cliente de cada venda do lote
+def draw_customer_indices(batch_size, pool_size, rng, is_new=None):
+    """
+    Reproduz, com arrays, a regra de `generate_sale_record`: cada venda tem
+    70% de chance de ser de um cliente já existente naquele momento e 30% de
+    criar um cliente novo, que passa a poder ser sorteado nas vendas seguintes.
+    `is_new` permite informar quais vendas criam clientes (modo paralelo).
+
+    Retorna os índices dos clientes no pool (os novos recebem índices a partir
+    de `pool_size`) e a quantidade de clientes novos a serem criados.
+    """
+    if is_new is None:
+        is_new = rng.random(batch_size) >= REPEAT_CUSTOMER_RATE
+        if pool_size == 0 and batch_size > 0:
+            is_new[0] = True  # Sem clientes no pool, a primeira venda cria um
+
+    new_until = np.cumsum(is_new)
+    available = pool_size + new_until - is_new  # Clientes existentes antes da venda
+    customer_idx = (rng.random(batch_size) * available).astype(np.int64)
+    customer_idx[is_new] = pool_size + new_until[is_new] - 1
+    return customer_idx, int(new_until[-1]) if batch_size else 0
+
+
+# Função para gerar um lote de vendas com operações vetorizadas
+def generate_sales_batch(
+    first_sale_id,
+    batch_size,
+    start_date,
+    end_date,
+    customers_pool,
+    rng,
+    locale_pools=None,
+    star_schema=False,
+):
+    """
+    Gera `batch_size` vendas como um DataFrame com as mesmas colunas de
+    `generate_sale_record`. Produtos, quantidades, clientes e datas são
+    sorteados como arrays NumPy e `Total_Venda` é calculado de uma vez.
+    `Data_Venda` sai como datetime64 (ao salvar em CSV o formato é o mesmo).
+    Com `star_schema=True` gera a tabela fato do modelo estrela.
+    """
+    customer_idx, num_new = draw_customer_indices(batch_size, len(customers_pool), rng)
+    generate_customers_batch(num_new, customers_pool, rng, locale_pools)
+    return build_sales_frame(
+        first_sale_id,
+        customer_idx,
+        start_date,
+        end_date,
+        customers_pool,
+        rng,
+        star_schema,
+    )
+
+
+# Função para sortear datas, produtos e quantidades das vendas (tabela fato)
+def build_sales_facts(first_sale_id, customer_idx, start_date, end_date, rng):
+    """
+    Retorna a tabela fato do modelo estrela: só chaves inteiras
+    (`ID_Cliente_SK` é o índice do cliente no `CustomerRegistry` e
+    `ID_Produto` o índice em `all_products`) e medidas.
+    """
+    batch_size = len(customer_idx)
+
+    start_ts = np.datetime64(start_date, "s").astype(np.int64)
+    end_ts = np.datetime64(end_date, "s").astype(np.int64)
+    sale_dates = rng.integers(start_ts, end_ts, size=batch_size, endpoint=True)
+
+    product_idx = rng.integers(0, len(all_products), size=batch_size, dtype=np.int8)
+    quantities = rng.integers(1, 6, size=batch_size, dtype=np.int8)
+
+    return pd.DataFrame(
+        {
+            "ID_Venda": np.arange(first_sale_id, first_sale_id + batch_size),
+            "Data_Venda": sale_dates.astype("datetime64[s]"),
+            "ID_Cliente_SK": customer_idx.astype(np.int32),
+            "ID_Produto": product_idx,
+            "Quantidade": quantities,
+            "Total_Venda": np.round(product_prices[product_idx] * quantities, 2),
+        }
+    )
+
+
+# Função para montar o DataFrame de vendas para clientes já sorteados
+def build_sales_frame(
+    first_sale_id,
+    customer_idx,
+    start_date,
+    end_date,
+    customers_pool,
+    rng,
+    star_schema=False,
+):
+    """Com `star_schema=True` retorna apenas a tabela fato (`build_sales_facts`)."""
+    facts = build_sales_facts(first_sale_id, customer_idx, start_date, end_date, rng)
+    if star_schema:
+        return facts
+
+    product_idx = facts["ID_Produto"].to_numpy()
+    return pd.DataFrame(
+        {
+            "ID_Venda": facts["ID_Venda"],
+            "Data_Venda": facts["Data_Venda"],
+            **customers_pool.take(customer_idx),
+            "Categoria_Produto": product_categories[product_idx],
+            "Produto": product_names[product_idx],
+            "Preço_Unitário": product_prices[product_idx],
+            "Quantidade": facts["Quantidade"],
+            "Total_Venda": facts["Total_Venda"],
+        }
+    )
+
+
+# Funções para montar as dimensões do modelo estrela
+def product_dimension():
+    return pd.DataFrame(
+        {
+            "ID_Produto": np.arange(len(all_products), dtype=np.int8),
+            "Categoria_Produto": product_categories,
+            "Produto": product_names,
+            "Preço_Unitário": product_prices,
+        }
+    )
+
+
+def iter_customer_dimension(customers_pool, batch_size=DEFAULT_BATCH_SIZE):
+    for start in range(0, len(customers_pool), batch_size):
+        customer_idx = np.arange(start, min(start + batch_size, len(customers_pool)))
+        yield pd.DataFrame(
+            {
+                "ID_Cliente_SK": customer_idx.astype(np.int32),
+                **customers_pool.take(customer_idx),
+            }
+        )
+
+
+# Gerador que produz as vendas em lotes de tamanho fixo
+def iter_sales_batches(
+    num_records,
+    start_date,
+    end_date,
+    customers_pool,
+    rng=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    first_sale_id=1,
+    locale_pools=None,
+    star_schema=False,
+):
+    if rng is None:
+        rng = np.random.default_rng()
+
+    last_sale_id = first_sale_id + num_records
+    for batch_start in range(first_sale_id, last_sale_id, batch_size):
+        yield generate_sales_batch(
+            batch_start,
+            min(batch_size, last_sale_id - batch_start),
+            start_date,
+            end_date,
+            customers_pool,
+            rng,
+            locale_pools,
+            star_schema,
+        )
+
+
+# Gerador equivalente para o modo linha a linha (`generate_sale_record`)
+def iter_sale_record_batches(
+    num_records,
+    start_date,
+    end_date,
+    customers_pool,
+    batch_size=DEFAULT_BATCH_SIZE,
+    first_sale_id=1,
+):
+    last_sale_id = first_sale_id + num_records
+    for batch_start in range(first_sale_id, last_sale_id, batch_size):
+        batch_end = min(batch_start + batch_size, last_sale_id)
+        yield pd.DataFrame(
+            [
+                generate_sale_record(i, start_date, end_date, customers_pool)
+                for i in range(batch_start, batch_end)
+            ]
+        )
+
+
+# --- ESCRITA EM STREAMING ---
+
+# Formatos de saída suportados e suas extensões ("feather" é o Arrow IPC)
+OUTPUT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+# Nomes dos arquivos do modelo estrela (dentro do diretório de saída)
+STAR_SCHEMA_TABLES = {
+    "fato_vendas": "vendas",
+    "clientes": "clientes",
+    "produtos": "produtos",
+}
+
+
+# Função com os schemas Arrow de cada tabela gravada em Parquet/Feather
+def arrow_schemas():
+    """
+    Colunas de texto com poucos valores distintos (`País`, `Categoria_Produto`,
+    `Produto`) usam dicionário: o valor vai uma vez para o dicionário e cada
+    linha guarda um código inteiro. As demais têm quase um valor por cliente.
+    """
+    import pyarrow as pa
+
+    country = pa.dictionary(pa.int16(), pa.string())
+    category = pa.dictionary(pa.int8(), pa.string())
+    return {
+        "vendas": pa.schema(
+            [
+                ("ID_Venda", pa.int64()),
+                ("Data_Venda", pa.timestamp("s")),
+                ("ID_Cliente", pa.string()),
+                ("Nome_Cliente", pa.string()),
+                ("Email_Cliente", pa.string()),
+                ("País", country),
+                ("Categoria_Produto", category),
+                ("Produto", pa.dictionary(pa.int8(), pa.string())),
+                ("Preço_Unitário", pa.float64()),
+                ("Quantidade", pa.int8()),
+                ("Total_Venda", pa.float64()),
+            ]
+        ),
+        "fato_vendas": pa.schema(
+            [
+                ("ID_Venda", pa.int64()),
+                ("Data_Venda", pa.timestamp("s")),
+                ("ID_Cliente_SK", pa.int32()),
+                ("ID_Produto", pa.int8()),
+                ("Quantidade", pa.int8()),
+                ("Total_Venda", pa.float64()),
+            ]
+        ),
+        "clientes": pa.schema(
+            [
+                ("ID_Cliente_SK", pa.int32()),
+                ("ID_Cliente", pa.string()),
+                ("Nome_Cliente", pa.string()),
+                ("Email_Cliente", pa.string()),
+                ("País", country),
+            ]
+        ),
+        "produtos": pa.schema(
+            [
+                ("ID_Produto", pa.int8()),
+                ("Categoria_Produto", category),
+                ("Produto", pa.string()),
+                ("Preço_Unitário", pa.float64()),
+            ]
+        ),
+    }
+
+
+# Função para descobrir o formato pela extensão do arquivo
+def infer_output_format(output_path):
+    for fmt, extension in OUTPUT_FORMATS.items():
+        if output_path.lower().endswith(extension):
+            return fmt
+    return "csv"
+
+
+class SalesWriter:
+    """
+    Grava lotes (DataFrames) de uma tabela de `arrow_schemas` em CSV,
+    Parquet ou Feather/Arrow IPC.
+
+    Em Parquet e Feather as colunas têm tipo fixo (`Data_Venda` como
+    timestamp, `Quantidade` como int8, etc.) e as colunas de dicionário do
+    schema são codificadas. O dicionário de cada coluna só cresce entre
+    lotes, o que permite gravá-lo em um único arquivo IPC como "deltas".
+    O Feather é gravado sem compressão, para poder ser lido com memory-map.
+    """
+
+    def __init__(self, output_path, fmt="csv", table="vendas"):
+        self.output_path = output_path
+        self.fmt = fmt
+        self._writer = None
+        self._first_batch = True
+        if fmt != "csv":
+            import pyarrow as pa
+
+            self._pa = pa
+            self.schema = arrow_schemas()[table]
+            self._dictionaries = {
+                field.name: []
+                for field in self.schema
+                if pa.types.is_dictionary(field.type)
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _to_record_batch(self, batch):
+        pa = self._pa
+        arrays = []
+        for field in self.schema:
+            values = batch[field.name]
+            if field.name in self._dictionaries:
+                # Novos valores entram no fim do dicionário, sem mudar os códigos antigos
+                categories = self._dictionaries[field.name]
+                known = set(categories)
+                categories.extend(v for v in pd.unique(values) if v not in known)
+                codes = pd.Categorical(values, categories=categories).codes
+                arrays.append(
+                    pa.DictionaryArray.from_arrays(
+                        codes.astype(field.type.index_type.to_pandas_dtype()),
+                        pa.array(categories, type=pa.string()),
+                    )
+                )
+            elif pa.types.is_timestamp(field.type):
+                dates = pd.to_datetime(values, format="%Y-%m-%d %H:%M:%S")
+                arrays.append(pa.array(dates.to_numpy().astype("datetime64[s]")))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        return pa.record_batch(arrays, schema=self.schema)
+
+    def write(self, batch):
+        if self.fmt == "csv":
+            batch.to_csv(
+                self.output_path,
+                mode="w" if self._first_batch else "a",
+                header=self._first_batch,
+                index=False,
+                encoding="utf-8",
+            )
+        else:
+            if self._writer is None:
+                if self.fmt == "parquet":
+                    import pyarrow.parquet as pq
+
+                    self._writer = pq.ParquetWriter(self.output_path, self.schema)
+                else:
+                    self._writer = self._pa.ipc.new_file(
+                        self.output_path,
+                        self.schema,
+                        options=self._pa.ipc.IpcWriteOptions(
+                            emit_dictionary_deltas=True
+                        ),
+                    )
+            self._writer.write_batch(self._to_record_batch(batch))
+        self._first_batch = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+# Função para ler de volta, lote a lote, um arquivo gravado pelo `SalesWriter`
+def read_sales_batches(path, fmt):
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=DEFAULT_BATCH_SIZE)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for record_batch in pq.ParquetFile(path).iter_batches(DEFAULT_BATCH_SIZE):
+            yield record_batch.to_pandas()
+    else:
+        import pyarrow as pa
+
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).to_pandas()
+
+
+# Função para gravar os lotes no arquivo à medida que são gerados
+def write_sales_stream(
+    batches, output_path, total_records=None, label="lote", fmt="csv", table="vendas"
+):
+    """
+    O primeiro lote cria o arquivo e os seguintes são anexados, então a
+    memória usada depende do tamanho do lote e não do total de registros.
+    A cada lote imprime o progresso e a vazão (registros/s).
+
+    Retorna o total de linhas gravadas e as 5 primeiras linhas do arquivo.
+    """
+    written = 0
+    preview = None
+    start = batch_start = time.perf_counter()
+    with SalesWriter(output_path, fmt, table) as writer:
+        for batch_number, batch in enumerate(batches, start=1):
+            writer.write(batch)
+            if preview is None:
+                preview = batch.head()
+            written += len(batch)
+
+            now = time.perf_counter()
+            progress = f"{written:,}" + (f"/{total_records:,}" if total_records else "")
+            if total_records:
+                progress += f" ({written / total_records:.1%})"
+            print(
+                f"[{label} {batch_number}] {progress} registros gravados | "
+                f"{len(batch) / (now - batch_start):,.0f} registros/s no lote | "
+                f"{written / (now - start):,.0f} registros/s no total"
+            )
+            batch_start = now
+    return written, preview
+
+
+# Função para gravar as dimensões do modelo estrela (clientes e produtos)
+def write_star_dimensions(customers_pool, output_dir, fmt="csv"):
+    extension = OUTPUT_FORMATS[fmt]
+    clientes_path = os.path.join(output_dir, STAR_SCHEMA_TABLES["clientes"] + extension)
+    with SalesWriter(clientes_path, fmt, table="clientes") as writer:
+        for batch in iter_customer_dimension(customers_pool):
+            writer.write(batch)
 
-except (ValueError, EOFError):
-    num_records = 10000
-    start_date = datetime(2020, 1, 1)
-    end_date = datetime.now()
+    produtos_path = os.path.join(output_dir, STAR_SCHEMA_TABLES["produtos"] + extension)
+    with SalesWriter(produtos_path, fmt, table="produtos") as writer:
+        writer.write(product_dimension())
 
-# --- INÍCIO DAS MODIFICAÇÕES ---
-# Pool de clientes
-customers_pool = []
 
-# --- FIM DAS MODIFICAÇÕES ---
+# --- GERAÇÃO PARALELA (SHARDS) ---
 
-# Geração dos dados de venda
-sales_data = [
-    generate_sale_record(i, start_date, end_date, customers_pool)
-    for i in range(1, num_records + 1)
+
+# Função para semear os geradores do Python e do Faker (nomes e emails)
+def seed_python_generators(seed):
+    random.seed(seed)
+    Faker.seed(seed)
+
+
+# Função para escolher o tamanho padrão dos shards para um total de vendas
+def default_shard_size(num_records):
+    shard_size = -(-num_records // TARGET_SHARDS)
+    return max(MIN_SHARD_SIZE, min(DEFAULT_SHARD_SIZE, shard_size))
+
+
+# Função para planejar os shards a partir de uma semente mestre
+def plan_shards(num_records, seed=None, shard_size=None):
+    """
+    Divide `num_records` em shards contíguos de `shard_size` vendas (padrão:
+    `default_shard_size`). Cada shard recebe:
+    - uma faixa própria de `ID_Venda` (IDs únicos no conjunto todo);
+    - sementes derivadas da semente mestre (`SeedSequence.spawn`), uma para
+      as vendas e outra para os clientes;
+    - quantos clientes novos ele cria e a partir de qual índice do pool
+      compartilhado, como se os shards fossem gerados em sequência.
+
+    Retorna a lista de shards e a semente usada para o planejamento e os
+    emails dos clientes. Sem registros (`num_records == 0`) não há shards.
+    """
+    shard_size = shard_size or default_shard_size(num_records)
+    num_shards = max(0, -(-num_records // shard_size))
+    customers_seed, *shard_seeds = np.random.SeedSequence(seed).spawn(num_shards + 1)
+    if num_shards == 0:
+        return [], customers_seed
+    plan_rng = np.random.default_rng(customers_seed)
+    shard_customers_seeds = customers_seed.spawn(num_shards)
+
+    sizes = np.full(num_shards, shard_size)
+    sizes[-1] = num_records - shard_size * (num_shards - 1)
+    # Soma de sorteios de Bernoulli por venda = binomial por shard
+    new_counts = plan_rng.binomial(sizes, 1 - REPEAT_CUSTOMER_RATE)
+    new_counts[0] = max(new_counts[0], min(1, sizes[0]))
+
+    first_ids = 1 + np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    customer_offsets = np.concatenate([[0], np.cumsum(new_counts)[:-1]])
+    shards = [
+        {
+            "index": k,
+            "first_sale_id": int(first_ids[k]),
+            "num_records": int(sizes[k]),
+            "customer_offset": int(customer_offsets[k]),
+            "num_new": int(new_counts[k]),
+            "seed": shard_seeds[k],
+            "customers_seed": shard_customers_seeds[k],
+        }
+        for k in range(num_shards)
+    ]
+    return shards, customers_seed
+
+
+# Pool de clientes e pools de localidades compartilhados pelos processos
+# (definidos em `_init_shard_worker`)
+_shard_customers = None
+_shard_locale_pools = None
+
+
+def _init_shard_worker(customers_pool=None, locale_pools=None):
+    global _shard_customers, _shard_locale_pools
+    _shard_customers = customers_pool
+    _shard_locale_pools = locale_pools
+
+
+# Função executada em cada processo: sorteia os clientes novos de um shard
+def draw_shard_customers(shard):
+    """
+    Sorteia (sem os emails) os `num_new` clientes novos do `shard`, com a
+    semente de clientes do próprio shard: o resultado não depende do processo
+    que o executa.
+    """
+    seed_python_generators(int(shard["customers_seed"].generate_state(1)[0]))
+    rng = np.random.default_rng(shard["customers_seed"])
+    return draw_customers(shard["num_new"], rng, _shard_locale_pools)
+
+
+# Função para unir, em ordem, os arquivos dos shards em um único arquivo
+def merge_parts(part_paths, output_path, fmt, table="vendas"):
+    if fmt == "csv":
+        # Copia os bytes de cada shard, mantendo apenas o cabeçalho do primeiro
+        with open(output_path, "wb") as output:
+            for k, part_path in enumerate(part_paths):
+                with open(part_path, "rb") as part:
+                    if k > 0:
+                        part.readline()
+                    shutil.copyfileobj(part, output)
+        return
+
+    # Parquet/Feather: regrava lote a lote, unificando os dicionários
+    with SalesWriter(output_path, fmt, table) as writer:
+        for part_path in part_paths:
+            for batch in read_sales_batches(part_path, fmt):
+                writer.write(batch)
+
+
+# Função executada em cada processo: gera um shard e o grava em um arquivo
+def generate_shard(
+    shard, start_date, end_date, output_path, batch_size, fmt="csv", star_schema=False
+):
+    rng = np.random.default_rng(shard["seed"])
+    num_records = shard["num_records"]
+    offset = shard["customer_offset"]
+
+    # Posições (dentro do shard) das vendas que criam clientes novos
+    is_new = np.zeros(num_records, dtype=bool)
+    # Pool vazio: a 1ª venda cria o cliente (se o shard tiver vendas)
+    first_free = min(1, shard["num_new"]) if offset == 0 else 0
+    is_new[:first_free] = True
+    is_new[
+        first_free
+        + rng.choice(
+            num_records - first_free, shard["num_new"] - first_free, replace=False
+        )
+    ] = True
+
+    def batches():
+        pool_size = offset
+        for batch_start in range(0, num_records, batch_size):
+            batch_is_new = is_new[batch_start : batch_start + batch_size]
+            customer_idx, num_new = draw_customer_indices(
+                len(batch_is_new), pool_size, rng, is_new=batch_is_new
+            )
+            pool_size += num_new
+            yield build_sales_frame(
+                shard["first_sale_id"] + batch_start,
+                customer_idx,
+                start_date,
+                end_date,
+                _shard_customers,
+                rng,
+                star_schema,
+            )
+
+    written, _ = write_sales_stream(
+        batches(),
+        output_path,
+        num_records,
+        label=f"shard {shard['index']} lote",
+        fmt=fmt,
+        table="fato_vendas" if star_schema else "vendas",
+    )
+    return output_path, written
+
+
+# Função para gerar a base em paralelo, em vários processos
+def generate_parallel(
+    num_records,
+    start_date,
+    end_date,
+    output_path,
+    seed=None,
+    workers=None,
+    locale_pools=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    shard_size=None,
+    fmt="csv",
+    partitioned=False,
+    star_schema=False,
+):
+    """
+    Gera `num_records` vendas em shards processados por um pool de processos
+    (`shard_size` vendas por shard; padrão: `default_shard_size`).
+
+    Os clientes são criados antes das vendas, em duas etapas: os processos
+    sorteiam nomes, países e IDs dos clientes novos de cada shard (a parte que
+    chama o Faker) e o processo principal cria os emails, em ordem, em um
+    único `CustomerRegistry` compartilhado com os processos. Assim os emails
+    continuam únicos e cada venda recorrente pode escolher qualquer cliente
+    criado antes dela, mantendo os ~70% de clientes recorrentes.
+
+    Os shards são unidos em um único arquivo `output_path`, ou, com
+    `partitioned=True`, `output_path` vira um diretório com um arquivo por
+    shard (`part-00000.csv`, ...). Para a mesma semente a saída é sempre a
+    mesma. Com `star_schema=True`, `output_path` é o diretório do modelo
+    estrela e os shards formam a tabela fato (`vendas`).
+    """
+    shards, customers_seed = plan_shards(num_records, seed, shard_size)
+
+    # "fork" (Linux) compartilha os pools sem copiá-los para cada processo
+    start_methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in start_methods else None)
+    with context.Pool(
+        workers, initializer=_init_shard_worker, initargs=(None, locale_pools)
+    ) as pool:
+        shard_customers = pool.map(draw_shard_customers, shards)
+
+    seed_python_generators(int(customers_seed.generate_state(1)[0]))
+    total_customers = sum(shard["num_new"] for shard in shards)
+    customers_pool = CustomerRegistry(capacity=max(1, total_customers))
+    for customers in shard_customers:
+        add_customers(customers_pool, customers)
+    del shard_customers
+    print(f"{len(customers_pool):,} clientes gerados para {len(shards)} shard(s).")
+
+    table = "fato_vendas" if star_schema else "vendas"
+    merged_path = output_path
+    if star_schema:
+        os.makedirs(output_path, exist_ok=True)
+        write_star_dimensions(customers_pool, output_path, fmt)
+        merged_path = os.path.join(output_path, STAR_SCHEMA_TABLES[table])
+        if not partitioned:
+            merged_path += OUTPUT_FORMATS[fmt]
+    parts_dir = merged_path if partitioned else merged_path + ".parts"
+    os.makedirs(parts_dir, exist_ok=True)
+
+    with context.Pool(
+        workers, initializer=_init_shard_worker, initargs=(customers_pool,)
+    ) as pool:
+        results = pool.starmap(
+            generate_shard,
+            [
+                (
+                    shard,
+                    start_date,
+                    end_date,
+                    os.path.join(
+                        parts_dir, f"part-{shard['index']:05d}{OUTPUT_FORMATS[fmt]}"
+                    ),
+                    batch_size,
+                    fmt,
+                    star_schema,
+                )
+                for shard in shards
+            ],
+        )
+
+    if not partitioned:
+        merge_parts([part_path for part_path, _ in results], merged_path, fmt, table)
+        shutil.rmtree(parts_dir)
+
+    return sum(written for _, written in results)
+
+
+# --- MODO DE ANEXAÇÃO (FEED CONTÍNUO) ---
+
+
+# Colunas esperadas no CSV ao qual as vendas são anexadas
+SALES_COLUMNS = [
+    "ID_Venda",
+    "Data_Venda",
+    "ID_Cliente",
+    "Nome_Cliente",
+    "Email_Cliente",
+    "País",
+    "Categoria_Produto",
+    "Produto",
+    "Preço_Unitário",
+    "Quantidade",
+    "Total_Venda",
 ]
 
-df = pd.DataFrame(sales_data)
 
-# Garante que o nome do arquivo termine com a extensão .csv
-if not nome_arquivo.endswith(".csv"):
-    nome_arquivo += ".csv"
+# Caminho do índice de clientes salvo ao lado do CSV
+def customers_index_path(csv_path):
+    return csv_path + ".clientes.pkl"
+
+
+# Versão do formato do índice de clientes (muda quando o formato muda)
+CUSTOMERS_INDEX_VERSION = 2
+
+# Quantos bytes do final do CSV entram na assinatura do arquivo
+SIGNATURE_TAIL_BYTES = 64 * 1024
+
+
+# Função para calcular a assinatura do CSV: tamanho, data de modificação e hash
+# do final do arquivo (onde as vendas são anexadas)
+def csv_signature(csv_path):
+    stat = os.stat(csv_path)
+    with open(csv_path, "rb") as file:
+        file.seek(max(0, stat.st_size - SIGNATURE_TAIL_BYTES))
+        tail_hash = hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "tail": tail_hash}
+
+
+# Função para ler o último ID_Venda lendo apenas o final do arquivo
+def read_last_sale_id(csv_path):
+    with open(csv_path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        file.seek(max(0, size - 64 * 1024))
+        lines = file.read().splitlines()
+    last_line = next((line for line in reversed(lines) if line.strip()), b"")
+    first_field = last_line.split(b",", 1)[0]
+    return int(first_field) if first_field.isdigit() else 0  # Só o cabeçalho: 0
+
+
+# Função para recriar o pool de clientes a partir das vendas do CSV
+def rebuild_customers_from_csv(csv_path):
+    """
+    Lê apenas as colunas de cliente, em blocos, e adiciona cada cliente ao
+    `CustomerRegistry` na ordem em que aparece pela primeira vez.
+    """
+    customers_pool = CustomerRegistry()
+    seen = set()
+    for chunk in pd.read_csv(
+        csv_path,
+        usecols=["ID_Cliente", "Nome_Cliente", "Email_Cliente", "País"],
+        chunksize=DEFAULT_BATCH_SIZE,
+    ):
+        chunk = chunk.drop_duplicates("ID_Cliente")
+        chunk = chunk[~chunk["ID_Cliente"].isin(seen)]
+        if chunk.empty:
+            continue
+        seen.update(chunk["ID_Cliente"])
+        hex_ids = "".join(chunk["ID_Cliente"]).replace("-", "")
+        raw_ids = np.frombuffer(bytes.fromhex(hex_ids), dtype=np.uint8)
+        customers_pool.extend_columns(
+            raw_ids.reshape(-1, 16),
+            chunk["Nome_Cliente"].to_numpy(),
+            chunk["Email_Cliente"].tolist(),
+            chunk["País"].to_numpy(),
+        )
+    return customers_pool
+
+
+# Função para carregar o índice de clientes (ou recriá-lo se estiver desatualizado)
+def load_customers_index(csv_path):
+    """
+    O índice é uma sequência de segmentos `pickle` gravados um após o outro:
+    o primeiro com todos os clientes e cada anexação seguinte só com os
+    clientes novos dela. Cada segmento guarda a posição do primeiro cliente,
+    o último `ID_Venda` e a assinatura do CSV (`csv_signature`) no momento em
+    que foi gravado. O índice só é usado se a assinatura do último segmento
+    bater com o CSV atual; caso contrário (ou se não existir, ou estiver
+    incompleto) é recriado lendo o CSV uma única vez.
+
+    Retorna o pool de clientes, o último `ID_Venda` e quantos clientes do
+    pool já estão gravados no índice (0 quando o índice foi recriado).
+    """
+    with open(csv_path, encoding="utf-8") as file:
+        header = file.readline().strip().split(",")
+    if header != SALES_COLUMNS:
+        raise ValueError(
+            f"'{csv_path}' não tem as colunas de vendas esperadas: {SALES_COLUMNS}"
+        )
+
+    index_path = customers_index_path(csv_path)
+    if os.path.exists(index_path):
+        customers_pool = CustomerRegistry()
+        segment = None
+        try:
+            with open(index_path, "rb") as file:
+                while True:
+                    try:
+                        segment = pickle.load(file)
+                    except EOFError:
+                        break
+                    if segment["version"] != CUSTOMERS_INDEX_VERSION or segment[
+                        "start"
+                    ] != len(customers_pool):
+                        segment = None
+                        break
+                    customers_pool.extend_columns(**segment["customers"])
+        except (pickle.UnpicklingError, KeyError, TypeError, ValueError):
+            segment = None  # Segmento incompleto (gravação interrompida)
+        if segment is not None and segment["csv"] == csv_signature(csv_path):
+            return customers_pool, segment["last_sale_id"], len(customers_pool)
+
+    print(f"Recriando o índice de clientes a partir de '{csv_path}'...")
+    return rebuild_customers_from_csv(csv_path), read_last_sale_id(csv_path), 0
+
+
+# Função para salvar o índice de clientes ao lado do CSV
+def save_customers_index(csv_path, customers_pool, last_sale_id, saved=0):
+    """
+    Grava os clientes a partir da posição `saved` (os que ainda não estão no
+    índice) como um novo segmento no fim do arquivo, de modo que o custo é
+    proporcional aos clientes novos e não ao pool todo. Com `saved=0` o
+    índice é regravado do zero. Retorna quantos clientes ficaram no índice.
+    """
+    segment = {
+        "version": CUSTOMERS_INDEX_VERSION,
+        "start": saved,
+        "customers": customers_pool.columns(saved),
+        "last_sale_id": last_sale_id,
+        "csv": csv_signature(csv_path),
+    }
+    with open(customers_index_path(csv_path), "ab" if saved else "wb") as file:
+        pickle.dump(segment, file, protocol=pickle.HIGHEST_PROTOCOL)
+    return len(customers_pool)
+
+
+# Função para anexar vendas novas ao final de um CSV existente
+def append_sales(
+    csv_path,
+    num_records,
+    customers_pool,
+    last_sale_id,
+    start_date,
+    end_date,
+    rng,
+    locale_pools=None,
+):
+    """
+    Gera `num_records` vendas continuando a partir de `last_sale_id` e as
+    anexa ao arquivo (sem cabeçalho). O custo é proporcional a `num_records`:
+    o arquivo existente não é lido. Retorna o novo último `ID_Venda`.
+    """
+    for batch in iter_sales_batches(
+        num_records,
+        start_date,
+        end_date,
+        customers_pool,
+        rng=rng,
+        first_sale_id=last_sale_id + 1,
+        locale_pools=locale_pools,
+    ):
+        batch.to_csv(csv_path, mode="a", header=False, index=False, encoding="utf-8")
+    return last_sale_id + num_records
+
+
+# Função para simular um feed: anexa vendas ao CSV a cada `interval` segundos
+def run_append_feed(
+    csv_path,
+    num_records,
+    interval=None,
+    iterations=None,
+    start_date=None,
+    end_date=None,
+    seed=None,
+    locale_pools=None,
+):
+    """
+    Sem `interval`, anexa uma única vez. Com `interval`, repete até
+    `iterations` vezes (ou até Ctrl+C), mantendo o pool de clientes em
+    memória entre as rodadas. Sem `start_date`/`end_date`, as vendas de
+    cada rodada ficam entre a rodada anterior (na primeira, a última
+    modificação do arquivo) e o momento atual.
+
+    O índice de clientes recebe, após cada rodada, um segmento com os
+    clientes novos dela, para a próxima execução.
+    """
+    customers_pool, last_sale_id, saved = load_customers_index(csv_path)
+    rng = np.random.default_rng(seed)
+    previous_tick = datetime.fromtimestamp(os.path.getmtime(csv_path))
+    tick = 0
+    while True:
+        now = datetime.now()
+        tick_start = time.perf_counter()
+        last_sale_id = append_sales(
+            csv_path,
+            num_records,
+            customers_pool,
+            last_sale_id,
+            start_date or previous_tick,
+            end_date or now,
+            rng,
+            locale_pools,
+        )
+        saved = save_customers_index(csv_path, customers_pool, last_sale_id, saved)
+        tick += 1
+        print(
+            f"[rodada {tick}] {num_records:,} vendas anexadas em "
+            f"{time.perf_counter() - tick_start:.2f}s "
+            f"(último ID_Venda: {last_sale_id:,}, {len(customers_pool):,} clientes)"
+        )
+        if interval is None or (iterations is not None and tick >= iterations):
+            break
+        previous_tick = now
+        time.sleep(interval)
+    return last_sale_id
+
+
+# --- LINHA DE COMANDO ---
+
+
+# Função para ler uma data no formato AAAA-MM-DD
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida: '{value}' (use AAAA-MM-DD)")
+
+
+# Função para ler as opções da linha de comando
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Gera uma base fictícia de vendas de eletrônicos.",
+        epilog="Sem argumentos, as opções são perguntadas interativamente.",
+    )
+    parser.add_argument(
+        "-o", "--saida", required=True, help="arquivo (ou diretório) de saída"
+    )
+    parser.add_argument(
+        "-n", "--registros", type=int, default=10000, help="quantidade de vendas"
+    )
+    parser.add_argument(
+        "--inicio",
+        type=parse_date,
+        help="data inicial das vendas, AAAA-MM-DD (padrão: 2020-01-01)",
+    )
+    parser.add_argument(
+        "--fim",
+        type=parse_date,
+        help="data final das vendas, AAAA-MM-DD (padrão: 31/12 do ano atual)",
+    )
+    parser.add_argument(
+        "-f",
+        "--formato",
+        choices=OUTPUT_FORMATS,
+        help="formato de saída (padrão: pela extensão de --saida, ou csv)",
+    )
+    parser.add_argument("--seed", type=int, help="semente para reproduzir a base")
+    parser.add_argument(
+        "--modo",
+        choices=["lote", "registro"],
+        default="lote",
+        help="geração vetorizada em lotes ou linha a linha (padrão: lote)",
+    )
+    parser.add_argument(
+        "--pools",
+        action="store_true",
+        help="usar nomes e países pré-sorteados por localidade (mais rápido)",
+    )
+    parser.add_argument(
+        "-p", "--processos", type=int, default=1, help="processos em paralelo"
+    )
+    parser.add_argument(
+        "--tamanho-shard",
+        type=int,
+        help=(
+            "com --processos > 1, vendas por shard (padrão: o total dividido "
+            f"em {TARGET_SHARDS}, entre {MIN_SHARD_SIZE} e {DEFAULT_SHARD_SIZE})"
+        ),
+    )
+    parser.add_argument(
+        "--particionado",
+        action="store_true",
+        help="com --processos > 1, grava um arquivo por shard no diretório --saida",
+    )
+    parser.add_argument(
+        "--estrela",
+        action="store_true",
+        help=(
+            "modelo estrela: --saida vira um diretório com as dimensões "
+            "clientes e produtos e a tabela fato vendas (chaves inteiras)"
+        ),
+    )
+    parser.add_argument(
+        "--anexar",
+        action="store_true",
+        help=(
+            "anexa -n vendas ao CSV --saida existente, continuando o ID_Venda "
+            "e reutilizando os clientes (datas padrão: desde a última anexação)"
+        ),
+    )
+    parser.add_argument(
+        "--intervalo",
+        type=float,
+        help="com --anexar, repete a anexação a cada INTERVALO segundos",
+    )
+    parser.add_argument(
+        "--repeticoes",
+        type=int,
+        help="com --intervalo, número de anexações (padrão: até Ctrl+C)",
+    )
+    parser.add_argument(
+        "--tamanho-lote",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"vendas por lote (padrão: {DEFAULT_BATCH_SIZE})",
+    )
+    args = parser.parse_args(argv)
+    if args.estrela and args.modo == "registro":
+        parser.error("--estrela só está disponível no modo 'lote'")
+    args.formato = args.formato or infer_output_format(args.saida)
+    if args.anexar:
+        if args.formato != "csv" or args.estrela:
+            parser.error("--anexar só está disponível para um CSV de vendas")
+        if not os.path.isfile(args.saida):
+            parser.error(f"--anexar: arquivo '{args.saida}' não encontrado")
+    else:
+        args.inicio = args.inicio or datetime(2020, 1, 1)
+        args.fim = args.fim or datetime(datetime.now().year, 12, 31)
+    return args
+
+
+# Função para perguntar as opções ao usuário (modo interativo)
+def ask_options():
+    # Coleta de informações do usuário
+    nome_arquivo = input("Insira o nome do arquivo (ex: 'meu_arquivo.csv'): ")
+
+    try:
+        num_records_input = input("Insira a quantidade de registros que deseja criar: ")
+        num_records = int(num_records_input) if num_records_input.strip() else 10000
+
+        # --- INÍCIO DAS MODIFICAÇÕES ---
+        year_start_input = input("Insira o ano de início para as vendas (ex: '2020'): ")
+        year_end_input = input("Insira o ano de fim para as vendas (ex: '2023'): ")
+
+        # Define valores padrão caso o usuário não insira nada
+        year_start = int(year_start_input) if year_start_input.strip() else 2020
+        year_end = (
+            int(year_end_input) if year_end_input.strip() else datetime.now().year
+        )
+
+        start_date = datetime(year_start, 1, 1)
+        end_date = datetime(year_end, 12, 31)
+
+        # --- FIM DAS MODIFICAÇÕES ---
+
+        mode_input = input(
+            "Modo de geração: 'lote' (vetorizado) ou 'registro' (linha a linha) [lote]: "
+        )
+        generation_mode = mode_input.strip().lower() or "lote"
+
+        pools_input = input(
+            "Usar nomes e países pré-sorteados por localidade (mais rápido)? (s/N): "
+        )
+        use_locale_pools = pools_input.strip().lower() == "s"
+
+        workers_input = input("Número de processos (1 = sem paralelismo) [1]: ")
+        workers = int(workers_input) if workers_input.strip() else 1
+
+        seed_input = input("Semente para reproduzir a base (vazio = aleatória): ")
+        seed = int(seed_input) if seed_input.strip() else None
+
+    except (ValueError, EOFError):
+        num_records = 10000
+        start_date = datetime(2020, 1, 1)
+        end_date = datetime.now()
+        generation_mode = "lote"
+        use_locale_pools = False
+        workers = 1
+        seed = None
+
+    fmt = infer_output_format(nome_arquivo)
+
+    return argparse.Namespace(
+        saida=nome_arquivo,
+        registros=num_records,
+        inicio=start_date,
+        fim=end_date,
+        formato=fmt,
+        seed=seed,
+        modo=generation_mode,
+        pools=use_locale_pools,
+        processos=workers,
+        particionado=False,
+        estrela=False,
+        anexar=False,
+        tamanho_lote=DEFAULT_BATCH_SIZE,
+        tamanho_shard=None,
+    )
+
+
+def main(options):
+    nome_arquivo = options.saida
+    num_records = options.registros
+    fmt = options.formato
+    seed = options.seed
+
+    if options.anexar:
+        if seed is not None:
+            seed_python_generators(seed)
+        try:
+            run_append_feed(
+                nome_arquivo,
+                num_records,
+                interval=options.intervalo,
+                iterations=options.repeticoes,
+                start_date=options.inicio,
+                end_date=options.fim,
+                seed=seed,
+                locale_pools=LocalePools() if options.pools else None,
+            )
+        except KeyboardInterrupt:
+            print("Anexação interrompida; índice salvo até a última rodada completa.")
+        return
+
+    # Garante que o nome do arquivo termine com a extensão do formato
+    extension = OUTPUT_FORMATS[fmt]
+    if options.estrela:
+        # No modelo estrela a saída é um diretório com uma tabela por arquivo
+        os.makedirs(nome_arquivo, exist_ok=True)
+        fato_path = os.path.join(
+            nome_arquivo, STAR_SCHEMA_TABLES["fato_vendas"] + extension
+        )
+    elif not options.particionado and not nome_arquivo.lower().endswith(extension):
+        nome_arquivo += extension
+
+    # --- INÍCIO DAS MODIFICAÇÕES ---
+    # Pool de clientes
+    customers_pool = CustomerRegistry()
+
+    # --- FIM DAS MODIFICAÇÕES ---
+
+    # Geração dos dados de venda, gravados no arquivo lote a lote
+    inicio = time.perf_counter()
+    if seed is not None:
+        seed_python_generators(seed)
+    locale_pools = LocalePools() if options.pools else None
+    if options.modo != "registro" and options.processos > 1:
+        generate_parallel(
+            num_records,
+            options.inicio,
+            options.fim,
+            nome_arquivo,
+            seed=seed,
+            workers=options.processos,
+            locale_pools=locale_pools,
+            batch_size=options.tamanho_lote,
+            shard_size=options.tamanho_shard,
+            fmt=fmt,
+            partitioned=options.particionado,
+            star_schema=options.estrela,
+        )
+        primeiras_linhas = None
+    else:
+        if options.modo == "registro":
+            batches = iter_sale_record_batches(
+                num_records,
+                options.inicio,
+                options.fim,
+                customers_pool,
+                batch_size=options.tamanho_lote,
+            )
+        else:
+            batches = iter_sales_batches(
+                num_records,
+                options.inicio,
+                options.fim,
+                customers_pool,
+                rng=np.random.default_rng(seed),
+                batch_size=options.tamanho_lote,
+                locale_pools=locale_pools,
+                star_schema=options.estrela,
+            )
+        if options.estrela:
+            _, primeiras_linhas = write_sales_stream(
+                batches, fato_path, num_records, fmt=fmt, table="fato_vendas"
+            )
+            write_star_dimensions(customers_pool, nome_arquivo, fmt)
+        else:
+            _, primeiras_linhas = write_sales_stream(
+                batches, nome_arquivo, num_records, fmt=fmt
+            )
+    duracao = time.perf_counter() - inicio
+
+    print(
+        f"A base de dados '{nome_arquivo}' foi criada com sucesso com {num_records} registros."
+    )
+    print(
+        f"Tempo de geração: {duracao:.2f}s ({num_records / duracao:,.0f} registros/s)"
+    )
+    if primeiras_linhas is not None:
+        print("\nPrimeiras 5 linhas do DataFrame:")
+        print(primeiras_linhas)
 
-# Salvar o DataFrame no arquivo com o nome fornecido pelo usuário
-df.to_csv(nome_arquivo, index=False, encoding="utf-8")
 
-print(
-    f"A base de dados '{nome_arquivo}' foi criada com sucesso com {num_records} registros."
-)
-print("\nPrimeiras 5 linhas do DataFrame:")
-print(df.head())
+if __name__ == "__main__":
+    main(parse_args() if len(sys.argv) > 1 else ask_options())
@@ -0,0 +1,144 @@
+"""
+Testes do gerador de vendas (`generate_dataset.py`).
+
+Rodam com `python -m pytest faker_lib`.
+"""
+
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import generate_dataset as gd
+
+START_DATE = datetime(2020, 1, 1)
+END_DATE = datetime(2023, 12, 31)
+
+
+def test_plan_shards_sem_registros():
+    shards, _ = gd.plan_shards(0, seed=1, shard_size=10)
+    assert shards == []
+
+
+def test_generate_shard_sem_registros(tmp_path):
+    shard = {
+        "index": 0,
+        "first_sale_id": 1,
+        "num_records": 0,
+        "customer_offset": 0,
+        "num_new": 0,
+        "seed": 1,
+    }
+    output_path, written = gd.generate_shard(
+        shard, START_DATE, END_DATE, str(tmp_path / "part.csv"), batch_size=10
+    )
+    assert written == 0
+    assert not os.path.exists(output_path)
+
+
+def test_generate_parallel_sem_registros(tmp_path):
+    output_path = str(tmp_path / "vendas.csv")
+    written = gd.generate_parallel(
+        0, START_DATE, END_DATE, output_path, seed=1, workers=2
+    )
+    assert written == 0
+    assert not os.path.exists(output_path + ".parts")
+
+
+def test_generate_parallel_mais_processos_que_registros(tmp_path):
+    output_path = str(tmp_path / "vendas.csv")
+    written = gd.generate_parallel(
+        5, START_DATE, END_DATE, output_path, seed=1, workers=8, shard_size=2
+    )
+    vendas = pd.read_csv(output_path)
+    assert written == 5
+    assert vendas["ID_Venda"].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_plan_shards_divide_o_total_entre_os_processos():
+    shards, _ = gd.plan_shards(1_000_000, seed=1)
+    assert len(shards) == gd.TARGET_SHARDS
+    assert sum(shard["num_records"] for shard in shards) == 1_000_000
+
+
+def test_generate_parallel_nao_depende_do_numero_de_processos(tmp_path):
+    saidas = []
+    for workers in (1, 3):
+        output_path = str(tmp_path / f"vendas_{workers}.csv")
+        gd.generate_parallel(
+            300,
+            START_DATE,
+            END_DATE,
+            output_path,
+            seed=1,
+            workers=workers,
+            shard_size=50,
+        )
+        with open(output_path, "rb") as file:
+            saidas.append(file.read())
+    assert saidas[0] == saidas[1]
+    vendas = pd.read_csv(str(tmp_path / "vendas_1.csv"))
+    clientes = vendas.drop_duplicates("ID_Cliente")
+    assert clientes["Email_Cliente"].is_unique
+
+
+def _base_vendas(tmp_path, num_records=500):
+    csv_path = str(tmp_path / "vendas.csv")
+    customers_pool = gd.CustomerRegistry()
+    gd.write_sales_stream(
+        gd.iter_sales_batches(
+            num_records,
+            START_DATE,
+            END_DATE,
+            customers_pool,
+            rng=np.random.default_rng(1),
+        ),
+        csv_path,
+    )
+    return csv_path
+
+
+def test_indice_clientes_grava_so_os_clientes_novos(tmp_path):
+    csv_path = _base_vendas(tmp_path)
+    customers_pool, last_sale_id, saved = gd.load_customers_index(csv_path)
+    assert saved == 0
+    rng = np.random.default_rng(2)
+    for _ in range(3):
+        last_sale_id = gd.append_sales(
+            csv_path, 200, customers_pool, last_sale_id, START_DATE, END_DATE, rng
+        )
+        anteriores = saved
+        saved = gd.save_customers_index(csv_path, customers_pool, last_sale_id, saved)
+        with open(gd.customers_index_path(csv_path), "rb") as file:
+            segmentos = []
+            while True:
+                try:
+                    segmentos.append(pickle.load(file))
+                except EOFError:
+                    break
+        assert segmentos[-1]["start"] == anteriores
+        assert len(segmentos[-1]["customers"]["names"]) == saved - anteriores
+
+    lido, ultimo_id, lidos = gd.load_customers_index(csv_path)
+    assert ultimo_id == last_sale_id == 1100
+    assert lidos == len(lido) == len(customers_pool)
+    assert list(lido.columns()["emails"]) == list(customers_pool.columns()["emails"])
+
+
+def test_indice_clientes_invalido_se_o_csv_muda_sem_mudar_de_tamanho(tmp_path):
+    csv_path = _base_vendas(tmp_path)
+    customers_pool, last_sale_id, saved = gd.load_customers_index(csv_path)
+    gd.save_customers_index(csv_path, customers_pool, last_sale_id, saved)
+    assert gd.load_customers_index(csv_path)[2] == len(customers_pool)
+
+    with open(csv_path, "rb") as file:
+        dados = bytearray(file.read())
+    dados[-3] = ord("8") if dados[-3] != ord("8") else ord("9")
+    stat = os.stat(csv_path)
+    with open(csv_path, "wb") as file:
+        file.write(dados)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert gd.load_customers_index(csv_path)[2] == 0